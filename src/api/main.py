@@ -1,4 +1,4 @@
-from src.ui.textual_table import TableApp
-
 if __name__ == "__main__":
+    from src.ui.textual_table import TableApp
+
     TableApp().run()
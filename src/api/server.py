@@ -2,40 +2,99 @@
 Market Data Service - FastAPI backend
 """
 
+import asyncio
 import os
+import time
 from contextlib import asynccontextmanager
-from typing import List, Optional, Dict, Any
+from functools import cache
+from importlib.metadata import PackageNotFoundError, version
+from typing import List, Literal, Optional, Dict, Any
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-import talib
-import numpy as np
 import logging
 
-from src.config import SYMBOLS, TABLE_MAP, INDICATORS
+from src.config import ROLE, SNAPSHOT_INTERVAL, TABLE_MAP, INDICATORS
 from src import db
-from src.data_client import init_client
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Seconds spent in each startup phase, reported by /startup
+startup_timings: Dict[str, float] = {}
+
+
+async def publish_snapshots():
+    """Writer loop: publish a snapshot for readers whenever there are new writes"""
+    while True:
+        if db.snapshot_pending():
+            try:
+                await asyncio.to_thread(db.publish_snapshot)
+            except Exception as e:
+                logger.error(f"Failed to publish snapshot: {e}")
+        await asyncio.sleep(SNAPSHOT_INTERVAL)
+
+
+def prewarm():
+    """
+    Load heavy modules and warm DuckDB after the server is accepting requests.
+
+    Runs in a background thread so the first healthy response does not wait for it.
+    """
+    started = time.perf_counter()
+    try:
+        from src import backtest, indicators, signals  # noqa: F401
+        from src.live_store import store
+
+        db.get_conn().execute("SELECT COUNT(*) FROM latest_values").fetchone()
+        store.load_all()
+    except Exception as e:
+        logger.warning(f"Prewarm incomplete: {e}")
+    startup_timings["prewarm"] = round(time.perf_counter() - started, 4)
+    logger.info(f"Prewarmed in {startup_timings['prewarm'] * 1000:.0f}ms")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize resources on startup"""
-    logger.info("Initializing database...")
-    db.init_db()
+    logger.info(f"Starting in {ROLE} mode")
+    snapshot_task = None
+    started = time.perf_counter()
 
-    api_key = os.getenv("ALPACA_API_KEY")
-    secret_key = os.getenv("ALPACA_SECRET_KEY")
-    if api_key and secret_key:
-        init_client("alpaca", api_key=api_key, secret_key=secret_key)
-        logger.info("Data client initialized")
+    # Readers never touch DB_PATH; the writer owns schema, ingestion and snapshots
+    if not db.is_read_only():
+        logger.info("Initializing database...")
+        db.init_db()
+        startup_timings["init_db"] = round(time.perf_counter() - started, 4)
+
+        api_key = os.getenv("ALPACA_API_KEY")
+        secret_key = os.getenv("ALPACA_SECRET_KEY")
+        if api_key and secret_key:
+            from src.data_client import init_client
+
+            init_client("alpaca", api_key=api_key, secret_key=secret_key)
+            logger.info("Data client initialized")
+
+        if ROLE == "writer":
+            snapshot_task = asyncio.create_task(publish_snapshots())
+
+    startup_timings["lifespan"] = round(time.perf_counter() - started, 4)
+    logger.info(f"Startup: lifespan took {startup_timings['lifespan'] * 1000:.0f}ms")
+    # Not cancelled on shutdown: cancelling does not stop the thread, which finishes
+    # on its own. The reference keeps the task from being garbage collected.
+    app.state.prewarm_task = asyncio.create_task(asyncio.to_thread(prewarm))
 
     yield
     logger.info("Shutting down...")
 
+    if snapshot_task:
+        snapshot_task.cancel()
+
+    from src import backtest
+
+    backtest.shutdown_pool()
+
 
 app = FastAPI(
     title="Market Data Service",
@@ -67,35 +126,46 @@ class BatchIndicatorRequest(BaseModel):
     params: Optional[Dict[str, Dict[str, Any]]] = Field(default_factory=dict)
 
 
+class SymbolsRequest(BaseModel):
+    symbols: List[str]
+
+
+class BacktestRequest(BaseModel):
+    timeframe: str
+    symbols: Optional[List[str]] = None  # defaults to the stored universe
+    params: Dict[str, List[Any]] = Field(default_factory=dict)  # parameter grid to sweep
+    include_curves: bool = False  # equity/drawdown curves, single combination only
+
+
 # Helpers
-def clean_nan(arr: np.ndarray) -> List:
-    """Convert NaN values to None for JSON serialization"""
-    return [None if (isinstance(x, float) and np.isnan(x)) else x for x in arr.tolist()]
+@cache
+def talib_version() -> Optional[str]:
+    """TA-Lib version from package metadata, without loading the native library"""
+    try:
+        return version("ta-lib")
+    except PackageNotFoundError:
+        return None
 
 
-# Indicator calculations
-def calculate_ema(close: np.ndarray, period: int = 9) -> Dict[str, List]:
-    result = talib.EMA(close, timeperiod=period)
-    return {"values": clean_nan(result)}
+def make_etag(symbol: str, timeframe: str, version: int) -> str:
+    """ETag for the current version of a (symbol, timeframe)"""
+    return f'"{symbol}-{timeframe}-{version}"'
 
 
-def calculate_macd(
-    close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9
-) -> Dict[str, List]:
-    macd, signal_line, histogram = talib.MACD(
-        close, fastperiod=fast, slowperiod=slow, signalperiod=signal
-    )
-    return {
-        "macd": clean_nan(macd),
-        "signal": clean_nan(signal_line),
-        "histogram": clean_nan(histogram),
-    }
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches the current ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
 
 
-INDICATOR_FUNCTIONS = {
-    "EMA": calculate_ema,
-    "MACD": calculate_macd,
-}
+def require_writer():
+    """Reject writes on read-only workers; they belong to the writer process"""
+    if db.is_read_only():
+        raise HTTPException(
+            status_code=503, detail="Read-only worker: send writes to the writer process"
+        )
 
 
 # Endpoints
@@ -106,12 +176,38 @@ def root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy", "talib_version": talib.__version__}
+    return {
+        "status": "healthy",
+        "talib_version": talib_version(),
+        "role": ROLE,
+        "snapshot": db.get_snapshot_info() if ROLE != "all" else None,
+    }
+
+
+@app.get("/startup")
+def get_startup_timings():
+    """Seconds spent initializing and prewarming this process"""
+    return {"timings": startup_timings}
 
 
 @app.get("/symbols")
 def get_symbols():
-    return {"symbols": SYMBOLS}
+    return {"symbols": db.get_symbols()}
+
+
+@app.post("/symbols", dependencies=[Depends(require_writer)])
+def add_symbols(request: SymbolsRequest):
+    """Add symbols to the stored universe"""
+    added = db.add_symbols(request.symbols)
+    return {"added": added, "symbols": db.get_symbols()}
+
+
+@app.delete("/symbols/{symbol}", dependencies=[Depends(require_writer)])
+def remove_symbol(symbol: str):
+    """Remove a symbol from the stored universe"""
+    if not db.remove_symbol(symbol):
+        raise HTTPException(status_code=404, detail=f"Unknown symbol: {symbol}")
+    return {"removed": symbol.upper(), "symbols": db.get_symbols()}
 
 
 @app.get("/timeframes")
@@ -121,34 +217,38 @@ def get_timeframes():
 
 @app.get("/db-size")
 def get_db_size():
+    from src.live_store import store
+
     try:
         size_info = db.get_db_size()
-        return {"database": size_info}
+        return {"database": size_info, "live_store": store.stats()}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/ingest/{start_date}/{end_date}")
-async def ingest_all_timeframes(start_date: str, end_date: str):
-    """Ingest market data for all timeframes"""
+@app.get("/ingest/{start_date}/{end_date}", dependencies=[Depends(require_writer)])
+async def ingest_all_timeframes(start_date: str, end_date: str, refresh: bool = False):
+    """
+    Ingest market data for all timeframes.
+
+    Re-running an unfinished range resumes it; `refresh` starts it over.
+    """
+    from src import ingest
     from src.data_client import data_client
 
     if not data_client:
         raise HTTPException(status_code=500, detail="Data client not initialized")
 
     results = {"success": [], "failed": []}
+    symbols = db.get_symbols()
+    ingest.start_job(start_date, end_date, refresh)
 
-    for timeframe, table_name in TABLE_MAP.items():
+    for timeframe in TABLE_MAP:
         try:
-            raw_bars = await data_client.get_all_bars(start_date, end_date, timeframe)
-            formatted_data = data_client.transform_bars(raw_bars)
-
-            if formatted_data:
-                logger.info(f"Inserting {len(formatted_data)} records into {table_name}")
-                db.save_market_data(formatted_data, timeframe)
-                results["success"].append({"timeframe": timeframe, "count": len(formatted_data)})
-            else:
-                results["success"].append({"timeframe": timeframe, "count": 0})
+            result = await ingest.ingest_range(
+                data_client, start_date, end_date, timeframe, symbols
+            )
+            results["success"].append({"timeframe": timeframe, **result})
 
         except Exception as e:
             logger.error(f"Failed to ingest {timeframe}: {e}")
@@ -157,9 +257,14 @@ async def ingest_all_timeframes(start_date: str, end_date: str):
     return {"message": "Data ingestion completed", "results": results}
 
 
-@app.get("/ingest/{start_date}/{end_date}/{timeframe}")
-async def ingest_timeframe(start_date: str, end_date: str, timeframe: str):
-    """Ingest market data for a specific timeframe"""
+@app.get("/ingest/{start_date}/{end_date}/{timeframe}", dependencies=[Depends(require_writer)])
+async def ingest_timeframe(start_date: str, end_date: str, timeframe: str, refresh: bool = False):
+    """
+    Ingest market data for a specific timeframe.
+
+    Re-running an unfinished range resumes it; `refresh` starts it over.
+    """
+    from src import ingest
     from src.data_client import data_client
 
     if not data_client:
@@ -169,28 +274,106 @@ async def ingest_timeframe(start_date: str, end_date: str, timeframe: str):
         raise HTTPException(status_code=400, detail=f"Invalid timeframe: {timeframe}")
 
     try:
-        raw_bars = await data_client.get_all_bars(start_date, end_date, timeframe)
-        formatted_data = data_client.transform_bars(raw_bars)
-
-        if formatted_data:
-            db.save_market_data(formatted_data, timeframe)
-
-        return {"message": "Data ingested!", "count": len(formatted_data)}
+        ingest.start_job(start_date, end_date, refresh)
+        result = await ingest.ingest_range(
+            data_client, start_date, end_date, timeframe, db.get_symbols()
+        )
+        return {"message": "Data ingested!", **result}
 
     except Exception as e:
         logger.error(f"Failed to ingest {timeframe}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def format_live_rows(rows) -> Dict[str, Any]:
+    """Build the /data bars and indicators payload from live store rows"""
+    from src.indicators import clean_nan
+
+    columns = {name: clean_nan(rows[name]) for name in ("open", "high", "low", "close", "vwap")}
+    volume = [None if v is None else int(v) for v in clean_nan(rows["volume"])]
+    bars = [
+        {
+            "time": t,
+            "open": o,
+            "high": h,
+            "low": lo,
+            "close": c,
+            "volume": v,
+            "vwap": vw,
+        }
+        for t, o, h, lo, c, v, vw in zip(
+            rows["time"].tolist(),
+            columns["open"],
+            columns["high"],
+            columns["low"],
+            columns["close"],
+            volume,
+            columns["vwap"],
+        )
+    ]
+
+    ta_rows = rows[rows["has_ta"]]
+    if not len(ta_rows):
+        return {"bars": bars, "indicators": {}}
+
+    ta = {
+        name: clean_nan(ta_rows[name])
+        for name in ("ema9", "macd", "macd_signal", "macd_histogram")
+    }
+    indicators = {
+        "EMA9": ta["ema9"],
+        "MACD": [
+            {"macd": m, "signal": s, "histogram": h}
+            for m, s, h in zip(ta["macd"], ta["macd_signal"], ta["macd_histogram"])
+        ],
+    }
+    return {"bars": bars, "indicators": indicators}
+
+
 @app.get("/data/{symbol}/{timeframe}")
-def get_market_data(symbol: str, timeframe: str):
-    """Get market data with indicators for a symbol"""
+def get_market_data(
+    symbol: str,
+    timeframe: str,
+    response: Response,
+    since: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    if_none_match: Optional[str] = Header(default=None),
+):
+    """
+    Get market data with indicators for a symbol.
+
+    Responses carry an ETag; a matching If-None-Match returns 304. With `since`
+    (the `version` of a previous response) only rows written after it are returned.
+    With `limit` only the latest bars are returned; windows that fit in the live
+    store are served from memory without touching the database.
+    """
     if timeframe not in TABLE_MAP:
         raise HTTPException(status_code=400, detail=f"Invalid timeframe: {timeframe}")
 
     try:
-        bars = db.get_market_data(symbol, timeframe)
-        ta_data = db.get_technical_analysis(symbol, timeframe)
+        if since is None:
+            from src.live_store import store
+
+            cached = store.get(symbol, timeframe, limit)
+            if cached is not None:
+                rows, version = cached
+                etag = make_etag(symbol, timeframe, version)
+                if etag_matches(if_none_match, etag):
+                    return Response(status_code=304, headers={"ETag": etag})
+
+                response.headers["ETag"] = etag
+                return {**format_live_rows(rows), "version": version}
+
+        # Read the version first so a concurrent write is re-sent, never skipped
+        version = db.get_data_version(symbol, timeframe)
+        etag = make_etag(symbol, timeframe, version)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
+        bars = db.get_market_data(symbol, timeframe, since, limit)
+        ta_data = db.get_technical_analysis(
+            symbol, timeframe, since, bars[0]["timestamp"] if limit and bars else None
+        )
 
         formatted_bars = [
             {
@@ -214,7 +397,13 @@ def get_market_data(symbol: str, timeframe: str):
                             indicators[key] = []
                         indicators[key].append(value)
 
-        return {"bars": formatted_bars, "indicators": indicators}
+        result = {"bars": formatted_bars, "indicators": indicators, "version": version}
+        if since is not None:
+            # Delta bars and indicator rows need not line up, so give indicators their times
+            result["indicator_times"] = [int(r["timestamp"].timestamp()) for r in ta_data]
+
+        response.headers["ETag"] = etag
+        return result
 
     except Exception as e:
         logger.error(f"Failed to fetch market data: {e}")
@@ -222,22 +411,104 @@ def get_market_data(symbol: str, timeframe: str):
 
 
 @app.get("/ta/{symbol}/{timeframe}")
-def get_ta_data(symbol: str, timeframe: str):
-    """Get technical analysis data for a symbol"""
+def get_ta_data(
+    symbol: str,
+    timeframe: str,
+    response: Response,
+    since: Optional[int] = None,
+    if_none_match: Optional[str] = Header(default=None),
+):
+    """Get technical analysis data for a symbol (supports ETag and `since` like /data)"""
+    try:
+        version = db.get_data_version(symbol, timeframe)
+        etag = make_etag(symbol, timeframe, version)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
+        data = db.get_technical_analysis(symbol, timeframe, since)
+        response.headers["ETag"] = etag
+        return {"data": data, "version": version}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/screen/{timeframe}")
+def screen(
+    timeframe: str,
+    close_vs_ema9: Optional[Literal["above", "below"]] = None,
+    ema9_cross: Optional[Literal["up", "down"]] = None,
+    macd_cross: Optional[Literal["up", "down"]] = None,
+    histogram_cross: Optional[Literal["up", "down"]] = None,
+    vwap_reclaim: Optional[Literal["up", "down"]] = None,
+    min_volume_ratio: Optional[float] = None,
+):
+    """
+    Screen the symbol universe on its latest bar and indicator values.
+
+    Cross filters match the crossover flags /ta/calculate stored on that bar.
+    """
+    if timeframe not in TABLE_MAP:
+        raise HTTPException(status_code=400, detail=f"Invalid timeframe: {timeframe}")
+
+    filters = {
+        name: value
+        for name, value in {
+            "close_vs_ema9": close_vs_ema9,
+            "ema9_cross": ema9_cross,
+            "macd_cross": macd_cross,
+            "histogram_cross": histogram_cross,
+            "vwap_reclaim": vwap_reclaim,
+        }.items()
+        if value is not None
+    }
+
+    try:
+        matches = db.screen_latest_values(timeframe, filters, min_volume_ratio)
+        return {"timeframe": timeframe, "count": len(matches), "matches": matches}
+    except Exception as e:
+        logger.error(f"Failed to run screen: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/signals/{symbol}/{timeframe}")
+def get_signals(
+    symbol: str,
+    timeframe: str,
+    signal: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+):
+    """Get signal events for a symbol, newest first"""
+    from src.signals import SIGNAL_NAMES
+
+    if timeframe not in TABLE_MAP:
+        raise HTTPException(status_code=400, detail=f"Invalid timeframe: {timeframe}")
+    if signal is not None and signal not in SIGNAL_NAMES:
+        raise HTTPException(status_code=400, detail=f"Invalid signal: {signal}")
+
     try:
-        data = db.get_technical_analysis(symbol, timeframe)
-        return {"data": data}
+        events = db.get_signal_events(symbol, timeframe, signal, limit)
+        return {"events": events}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/ta/calculate")
-def calculate_all_indicators():
-    """Calculate indicators for all symbols and timeframes"""
+@app.get("/ta/calculate", dependencies=[Depends(require_writer)])
+def calculate_all_indicators(incremental: bool = False):
+    """
+    Calculate indicators and signals for all symbols and timeframes.
+
+    With `incremental`, only bars newer than the last stored analysis are written
+    and evaluated for signals.
+    """
+    import numpy as np
+
+    from src import signals
+    from src.indicators import INDICATOR_FUNCTIONS
+
     logger.info("Starting indicator calculations...")
     results = {"success": [], "failed": []}
 
-    for symbol in SYMBOLS:
+    for symbol in db.get_symbols():
         for timeframe in TABLE_MAP.keys():
             try:
                 bars = db.get_market_data(symbol, timeframe)
@@ -246,7 +517,19 @@ def calculate_all_indicators():
                     logger.warning(f"No data for {symbol} ({timeframe})")
                     continue
 
+                start = 0
+                if incremental:
+                    last_ts = db.get_latest_ta_timestamp(symbol, timeframe)
+                    if last_ts is not None:
+                        start = next(
+                            (i for i, b in enumerate(bars) if b["timestamp"] > last_ts), len(bars)
+                        )
+                if start == len(bars):
+                    results["success"].append({"symbol": symbol, "timeframe": timeframe, "new": 0})
+                    continue
+
                 close = np.array([b["close"] for b in bars], dtype=np.float64)
+                vwap = np.array([b["vwap"] for b in bars], dtype=np.float64)
 
                 # Calculate indicators
                 indicator_results = {}
@@ -256,9 +539,22 @@ def calculate_all_indicators():
                     calc_func = INDICATOR_FUNCTIONS[func_name]
                     indicator_results[ind_key] = calc_func(close, **params)
 
+                # Evaluate signals for the new bars only
+                macd = indicator_results["MACD"]
+                signal_arrays = signals.compute_signals(
+                    close,
+                    vwap,
+                    np.array(indicator_results["EMA9"]["values"], dtype=np.float64),
+                    np.array(macd["macd"], dtype=np.float64),
+                    np.array(macd["signal"], dtype=np.float64),
+                    np.array(macd["histogram"], dtype=np.float64),
+                    start=start,
+                )
+                bar_signals = signals.to_bar_signals(signal_arrays)
+
                 # Structure results per bar
                 ta_records = []
-                for i, bar in enumerate(bars):
+                for i in range(start, len(bars)):
                     bar_indicators = {}
                     for ind_key, ind_data in indicator_results.items():
                         if "values" in ind_data:
@@ -270,15 +566,26 @@ def calculate_all_indicators():
                         {
                             "symbol": symbol,
                             "timeframe": timeframe,
-                            "timestamp": bar["timestamp"],
+                            "timestamp": bars[i]["timestamp"],
                             "indicators": bar_indicators,
-                            "signals": None,
+                            "signals": bar_signals[i - start],
                             "data_points_used": len(bars),
                         }
                     )
 
                 db.save_technical_analysis(ta_records)
-                results["success"].append({"symbol": symbol, "timeframe": timeframe})
+                db.save_signal_events(
+                    symbol,
+                    timeframe,
+                    bars[start]["timestamp"],
+                    [
+                        (bars[start + i]["timestamp"], name, direction)
+                        for i, name, direction in signals.to_events(signal_arrays)
+                    ],
+                )
+                results["success"].append(
+                    {"symbol": symbol, "timeframe": timeframe, "new": len(ta_records)}
+                )
                 logger.info(f"Calculated indicators for {symbol} ({timeframe})")
 
             except Exception as e:
@@ -290,9 +597,36 @@ def calculate_all_indicators():
     return {"message": "Indicator calculations completed", "results": results}
 
 
+@app.post("/backtest")
+def run_backtest(request: BacktestRequest):
+    """Backtest the MACD cross / EMA9 stop strategy over stored bars and indicators"""
+    from src import backtest
+
+    if request.timeframe not in TABLE_MAP:
+        raise HTTPException(status_code=400, detail=f"Invalid timeframe: {request.timeframe}")
+
+    try:
+        backtest.expand_grid(request.params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        symbols = request.symbols or db.get_symbols()
+        series = db.get_backtest_series(symbols, request.timeframe)
+        results = backtest.run_backtest(series, request.params, request.include_curves)
+        return {"timeframe": request.timeframe, "count": len(results), "results": results}
+    except Exception as e:
+        logger.error(f"Backtest failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/calculate")
 def calculate_indicators(request: BatchIndicatorRequest):
     """Calculate indicators on provided data"""
+    import numpy as np
+
+    from src.indicators import INDICATOR_FUNCTIONS
+
     results = {}
     errors = {}
 
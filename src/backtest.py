@@ -0,0 +1,237 @@
+"""
+Vectorized backtesting over stored bars and indicators.
+
+Strategy: go long when MACD crosses above its signal line, exit when the close
+falls below EMA9 (optionally with a buffer) or, if enabled, on the opposite MACD
+cross. Orders fill at the next bar's open.
+"""
+import itertools
+import logging
+import math
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Optional
+
+import numpy as np
+
+from src.config import BACKTEST_WORKERS
+from src.signals import crosses
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARAMS = {
+    "stop_buffer": 0.0,  # exit when close < EMA9 * (1 - stop_buffer)
+    "exit_on_macd_cross": False,  # also exit when MACD crosses below its signal
+    "fee_bps": 1.0,  # cost per unit of position change, in basis points
+}
+
+# Below this many simulations the pool's startup and pickling cost outweighs the gain
+MIN_PARALLEL_RUNS = 32
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Get or create the shared backtest worker pool"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=BACKTEST_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def shutdown_pool(wait: bool = True):
+    """Shut down the worker pool; the next parallel sweep starts a new one"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
+
+def _coerce_param(name: str, value: Any) -> Any:
+    """Check a parameter value against the type of its default."""
+    if isinstance(DEFAULT_PARAMS[name], bool):
+        if not isinstance(value, bool):
+            raise ValueError(f"Backtest parameter {name} must be true or false, got {value!r}")
+        return value
+
+    number = None
+    if isinstance(value, (int, float, str)) and not isinstance(value, bool):
+        try:
+            number = float(value)
+        except ValueError:
+            pass
+    if number is None or not math.isfinite(number) or number < 0:
+        raise ValueError(f"Backtest parameter {name} must be a number >= 0, got {value!r}")
+    return number
+
+
+def expand_grid(grid: dict[str, list]) -> list[dict[str, Any]]:
+    """Expand a parameter grid into every combination, filling in defaults."""
+    unknown = set(grid) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown backtest parameters: {', '.join(sorted(unknown))}")
+
+    keys = list(DEFAULT_PARAMS)
+    values = [
+        [_coerce_param(key, value) for value in grid.get(key) or [DEFAULT_PARAMS[key]]]
+        for key in keys
+    ]
+    return [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+
+
+def _forward_fill(events: np.ndarray) -> np.ndarray:
+    """Carry the last non-NaN value forward; leading NaNs become 0."""
+    idx = np.where(np.isnan(events), 0, np.arange(len(events)))
+    np.maximum.accumulate(idx, out=idx)
+    filled = events[idx]
+    return np.nan_to_num(filled, nan=0.0)
+
+
+def simulate(arrays: dict[str, np.ndarray], params: dict[str, Any], curves: bool = False) -> dict:
+    """
+    Simulate the strategy over one symbol's series.
+
+    Args:
+        arrays: Aligned "time", "open", "close", "ema9", "macd", "macd_signal" arrays
+        params: Strategy parameters (see DEFAULT_PARAMS)
+        curves: Include equity and drawdown curves in the result
+
+    Returns:
+        Dict of summary metrics, plus "time"/"equity"/"drawdown" lists if curves
+    """
+    open_, close, ema9 = arrays["open"], arrays["close"], arrays["ema9"]
+    n = len(close)
+    if n < 2:
+        return {
+            "bars": n,
+            "total_return": 0.0,
+            "max_drawdown": 0.0,
+            "trades": 0,
+            "win_rate": None,
+            "exposure": 0.0,
+        }
+
+    macd_cross = crosses(arrays["macd"], arrays["macd_signal"])
+    with np.errstate(invalid="ignore"):
+        exit_ = close < ema9 * (1 - params["stop_buffer"])
+    if params["exit_on_macd_cross"]:
+        exit_ |= macd_cross < 0
+    entry = (macd_cross > 0) & ~exit_
+
+    # Desired position after each bar's close, held from the next bar's open
+    target = _forward_fill(np.where(entry, 1.0, np.where(exit_, 0.0, np.nan)))
+    held = np.concatenate(([0.0], target[:-1]))
+
+    # Open-to-open returns; the final bar is marked to its close
+    bar_returns = np.empty(n)
+    bar_returns[:-1] = open_[1:] / open_[:-1] - 1
+    bar_returns[-1] = close[-1] / open_[-1] - 1
+
+    changes = np.diff(held, prepend=0.0)
+    costs = np.abs(changes) * params["fee_bps"] / 10_000
+    strategy_returns = held * bar_returns - costs
+
+    equity = np.cumprod(1 + strategy_returns)
+    drawdown = equity / np.maximum.accumulate(equity) - 1
+
+    # Per-trade returns: label bars by trade and sum log returns per label; the
+    # exit bar (where the position drops to zero) carries the trade's exit fee
+    entries = changes > 0
+    trade_id = np.cumsum(entries) * ((held > 0) | (changes < 0))
+    n_trades = int(entries.sum())
+    trade_returns = np.expm1(
+        np.bincount(trade_id, weights=np.log1p(strategy_returns), minlength=n_trades + 1)[1:]
+    )
+
+    result = {
+        "bars": n,
+        "total_return": float(equity[-1] - 1),
+        "max_drawdown": float(drawdown.min()),
+        "trades": n_trades,
+        "win_rate": float((trade_returns > 0).mean()) if n_trades else None,
+        "exposure": float(held.mean()),
+    }
+
+    if curves:
+        result["time"] = arrays["time"].tolist()
+        result["equity"] = equity.tolist()
+        result["drawdown"] = drawdown.tolist()
+
+    return result
+
+
+def _run_batch(arrays: dict[str, np.ndarray], param_sets: list[dict]) -> list[dict]:
+    """Worker entry point: run several parameter sets over one symbol's arrays."""
+    return [simulate(arrays, params) for params in param_sets]
+
+
+def _run_parallel(
+    series: dict[str, dict[str, np.ndarray]], param_sets: list[dict], chunks: int
+) -> list[dict]:
+    """Split each symbol's parameter sets into chunks and run them on the pool."""
+    pool = get_pool()
+    size = -(-len(param_sets) // chunks)
+    futures = []
+    for symbol, arrays in series.items():
+        for i in range(0, len(param_sets), size):
+            batch = param_sets[i:i + size]
+            futures.append((symbol, batch, pool.submit(_run_batch, arrays, batch)))
+
+    results = []
+    for symbol, batch, future in futures:
+        for params, metrics in zip(batch, future.result()):
+            results.append({"symbol": symbol, "params": params, **metrics})
+    return results
+
+
+def run_backtest(
+    series: dict[str, dict[str, np.ndarray]],
+    grid: dict[str, list],
+    curves: bool = False,
+    max_workers: Optional[int] = None,
+) -> list[dict]:
+    """
+    Run every parameter combination for every symbol.
+
+    Each symbol's arrays are read once; parameter sets are split into chunks that
+    run on the shared process pool when the sweep is large enough to benefit.
+
+    Args:
+        series: Symbol -> arrays, as returned by db.get_backtest_series
+        grid: Parameter name -> list of values to sweep
+        curves: Include equity/drawdown curves (only honoured for a single combination)
+        max_workers: Chunks per symbol; defaults to the pool size
+
+    Returns:
+        One result per (symbol, parameter set), best total return first
+    """
+    param_sets = expand_grid(grid)
+    curves = curves and len(param_sets) == 1
+    total_runs = len(param_sets) * len(series)
+
+    results = []
+    if total_runs < MIN_PARALLEL_RUNS or curves:
+        for symbol, arrays in series.items():
+            for params in param_sets:
+                metrics = simulate(arrays, params, curves)
+                results.append({"symbol": symbol, "params": params, **metrics})
+    else:
+        chunks = max_workers or BACKTEST_WORKERS
+        try:
+            results = _run_parallel(series, param_sets, chunks)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); replace the pool and retry once
+            logger.warning("Backtest pool broken, restarting it")
+            shutdown_pool(wait=False)
+            results = _run_parallel(series, param_sets, chunks)
+
+    logger.info(f"Ran {total_runs} backtests over {len(series)} symbols")
+    results.sort(key=lambda r: r["total_return"], reverse=True)
+    return results
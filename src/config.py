@@ -7,13 +7,47 @@ from pathlib import Path
 # Database
 DB_PATH = os.getenv("DB_PATH", str(Path(__file__).parent.parent / "data" / "zenigh.duckdb"))
 
+# Process role: "all" (single process), "writer" (owns DB_PATH, publishes snapshots)
+# or "reader" (read-only API worker serving the latest snapshot)
+ROLE = os.getenv("ZENIGH_ROLE", "all")
+# Each snapshot is written to its own <stem>.<version>.duckdb file next to SNAPSHOT_PATH,
+# and <stem>.current names the latest one
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", str(Path(DB_PATH).with_suffix(".snapshot.duckdb")))
+# Readers lag the writer by at most SNAPSHOT_INTERVAL + SNAPSHOT_CHECK_INTERVAL
+# seconds plus the time to copy the database
+SNAPSHOT_INTERVAL = float(os.getenv("SNAPSHOT_INTERVAL", "5"))
+SNAPSHOT_CHECK_INTERVAL = float(os.getenv("SNAPSHOT_CHECK_INTERVAL", "1"))
+
+# Seed for the symbol universe; the live universe is stored in DuckDB
 SYMBOLS = ["SPY"]
 
+# Multi-symbol request sharding (per-request symbol cap and query string budget)
+MAX_SYMBOLS_PER_REQUEST = int(os.getenv("MAX_SYMBOLS_PER_REQUEST", "100"))
+MAX_SYMBOLS_QUERY_CHARS = int(os.getenv("MAX_SYMBOLS_QUERY_CHARS", "1500"))
+
+# Provider request scheduling (Alpaca free tier allows 200 requests/minute)
+RATE_LIMIT_PER_MINUTE = float(os.getenv("RATE_LIMIT_PER_MINUTE", "200"))
+MAX_RETRIES = int(os.getenv("MAX_RETRIES", "5"))
+MAX_CONCURRENCY = int(os.getenv("MAX_CONCURRENCY", "4"))
+
 TABLE_MAP = {
     "5T": "market_data_5m",
     "15T": "market_data_15m",
 }
 
+# Latest bars per (symbol, timeframe) kept in the in-process live store (0 disables)
+LIVE_STORE_CAPACITY = int(os.getenv("LIVE_STORE_CAPACITY", "500"))
+
+# Worker processes for backtest parameter sweeps, per API process. Each uvicorn worker
+# (WEB_CONCURRENCY) starts its own pool, so the default splits the CPUs between them
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+BACKTEST_WORKERS = int(
+    os.getenv("BACKTEST_WORKERS", str(max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY)))
+)
+
+# Bars averaged for the screener's volume-vs-average comparison
+VOLUME_AVG_PERIOD = 20
+
 # Note: VWAP and volume come from bar data directly
 INDICATORS = {
     "EMA9": {"function": "EMA", "dataType": "close", "params": {"period": 9}},
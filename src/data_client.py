@@ -3,16 +3,59 @@ Generic HTTP client for market data providers.
 Swap out the implementation for your specific provider.
 """
 import logging
+import math
 from datetime import datetime
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 import httpx
 
-from src.config import SYMBOLS
+from src.config import (
+    MAX_CONCURRENCY,
+    MAX_RETRIES,
+    MAX_SYMBOLS_PER_REQUEST,
+    MAX_SYMBOLS_QUERY_CHARS,
+    RATE_LIMIT_PER_MINUTE,
+    SYMBOLS,
+)
+from src.rate_limiter import RequestScheduler
 
 logger = logging.getLogger(__name__)
 
 
+def shard_symbols(
+    symbols: list[str],
+    max_symbols: int = MAX_SYMBOLS_PER_REQUEST,
+    max_chars: int = MAX_SYMBOLS_QUERY_CHARS,
+) -> list[list[str]]:
+    """
+    Split symbols into batches for multi-symbol requests.
+
+    Each batch respects the provider's per-request symbol cap and keeps the joined
+    `symbols=` parameter under `max_chars`. Batches are balanced in size so the
+    last shard is not a straggler.
+    """
+    if not symbols:
+        return []
+
+    joined_chars = sum(len(s) for s in symbols) + len(symbols) - 1
+    n_batches = max(math.ceil(len(symbols) / max_symbols), math.ceil(joined_chars / max_chars))
+    target = min(max_symbols, math.ceil(len(symbols) / n_batches))
+
+    batches: list[list[str]] = []
+    batch: list[str] = []
+    chars = 0
+    for symbol in symbols:
+        extra = len(symbol) + (1 if batch else 0)
+        if batch and (len(batch) >= target or chars + extra > max_chars):
+            batches.append(batch)
+            batch, chars, extra = [], 0, len(symbol)
+        batch.append(symbol)
+        chars += extra
+    batches.append(batch)
+
+    return batches
+
+
 class DataClient:
     """
     Generic market data client. Subclass or modify for your provider.
@@ -32,11 +75,31 @@ class DataClient:
         base_url: str,
         headers: Optional[dict] = None,
         timeout: float = 30.0,
+        rate_limit_per_minute: float = RATE_LIMIT_PER_MINUTE,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
     ):
         self.base_url = base_url.rstrip("/")
         self.headers = headers or {}
         self.timeout = timeout
+        self.transport = transport  # e.g. httpx.MockTransport in tests
         self.symbols = SYMBOLS
+        self.scheduler = RequestScheduler(
+            requests_per_minute=rate_limit_per_minute,
+            max_retries=MAX_RETRIES,
+            max_concurrency=MAX_CONCURRENCY,
+        )
+
+    async def _get(self, path: str, params: dict) -> dict:
+        """GET a provider endpoint through the rate-limited, retrying scheduler."""
+        async with httpx.AsyncClient(timeout=self.timeout, transport=self.transport) as client:
+            response = await self.scheduler.request(
+                client,
+                "GET",
+                f"{self.base_url}{path}",
+                params=params,
+                headers=self.headers,
+            )
+            return response.json()
 
     async def get_bars(
         self,
@@ -44,6 +107,7 @@ class DataClient:
         end: str,
         timeframe: str,
         page_token: Optional[str] = None,
+        symbols: Optional[list[str]] = None,
     ) -> dict:
         """
         Fetch a single page of bars from the provider.
@@ -53,12 +117,13 @@ class DataClient:
             end: End date (ISO format)
             timeframe: Timeframe string (provider-specific)
             page_token: Pagination token if applicable
+            symbols: Symbols to request (defaults to self.symbols)
 
         Returns:
             Raw response dict from provider
         """
         params = {
-            "symbols": ",".join(self.symbols),
+            "symbols": ",".join(self.symbols if symbols is None else symbols),
             "start": start,
             "end": end,
             "timeframe": timeframe,
@@ -68,37 +133,35 @@ class DataClient:
         if page_token:
             params["page_token"] = page_token
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(
-                f"{self.base_url}/bars",
-                params=params,
-                headers=self.headers,
-            )
-            response.raise_for_status()
-            return response.json()
+        return await self._get("/bars", params)
 
-    async def get_all_bars(self, start: str, end: str, timeframe: str) -> dict[str, list]:
+    async def iter_pages(
+        self,
+        start: str,
+        end: str,
+        timeframe: str,
+        page_token: Optional[str] = None,
+        symbols: Optional[list[str]] = None,
+    ) -> AsyncIterator[tuple[dict[str, list], Optional[str]]]:
         """
-        Fetch all bars with pagination handling.
+        Iterate over pages of bars, starting from `page_token` if given.
 
-        Returns:
-            Dict mapping symbol -> list of bar dicts
+        Each page is retried on its own page_token by the scheduler, so a 429 or
+        transient 5xx midway through resumes from the failed page instead of
+        restarting from the first one.
+
+        Yields:
+            (bars_data, next_page_token) where bars_data maps symbol -> list of bar
+            dicts and next_page_token is None on the last page
         """
-        all_bars: dict[str, list] = {}
-        page_token = None
         page_count = 0
 
         while True:
-            page = await self.get_bars(start, end, timeframe, page_token)
+            page = await self.get_bars(start, end, timeframe, page_token, symbols)
 
-            # Merge bars - adapt this key based on your provider's response structure
+            # Adapt this key based on your provider's response structure
             bars_data = page.get("bars", page)  # Some APIs nest under "bars", some don't
 
-            for symbol, symbol_bars in bars_data.items():
-                if symbol not in all_bars:
-                    all_bars[symbol] = []
-                all_bars[symbol].extend(symbol_bars)
-
             # Check for next page - adapt based on your provider
             page_token = page.get("next_page_token")
             page_count += 1
@@ -107,8 +170,27 @@ class DataClient:
                 logger.info(f"Fetched page {page_count}, continuing...")
             else:
                 logger.info(f"Completed: fetched {page_count} page(s)")
+
+            yield bars_data, page_token
+
+            if not page_token:
                 break
 
+    async def get_all_bars(self, start: str, end: str, timeframe: str) -> dict[str, list]:
+        """
+        Fetch all bars with pagination handling.
+
+        Returns:
+            Dict mapping symbol -> list of bar dicts
+        """
+        all_bars: dict[str, list] = {}
+
+        async for bars_data, _ in self.iter_pages(start, end, timeframe):
+            for symbol, symbol_bars in bars_data.items():
+                if symbol not in all_bars:
+                    all_bars[symbol] = []
+                all_bars[symbol].extend(symbol_bars)
+
         return all_bars
 
     def transform_bars(self, raw_bars: dict[str, list]) -> list[dict]:
@@ -167,9 +249,10 @@ class AlpacaClient(DataClient):
         end: str,
         timeframe: str,
         page_token: Optional[str] = None,
+        symbols: Optional[list[str]] = None,
     ) -> dict:
         params = {
-            "symbols": ",".join(self.symbols),
+            "symbols": ",".join(self.symbols if symbols is None else symbols),
             "start": start,
             "end": end,
             "timeframe": timeframe,
@@ -182,14 +265,7 @@ class AlpacaClient(DataClient):
         if page_token:
             params["page_token"] = page_token
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(
-                f"{self.base_url}/bars",
-                params=params,
-                headers=self.headers,
-            )
-            response.raise_for_status()
-            return response.json()
+        return await self._get("/bars", params)
 
 
 # Default client instance - replace with your provider
@@ -217,6 +293,8 @@ def init_client(provider: str = "alpaca", **kwargs) -> DataClient:
         data_client = DataClient(
             base_url=kwargs.get("base_url", ""),
             headers=kwargs.get("headers", {}),
+            rate_limit_per_minute=kwargs.get("rate_limit_per_minute", RATE_LIMIT_PER_MINUTE),
+            transport=kwargs.get("transport"),
         )
 
     return data_client
@@ -4,28 +4,254 @@ Database operations using DuckDB
 
 import json
 import logging
+import os
+import threading
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import duckdb
 
-from src.config import DB_PATH
+from src.config import (
+    DB_PATH,
+    LIVE_STORE_CAPACITY,
+    ROLE,
+    SNAPSHOT_CHECK_INTERVAL,
+    SNAPSHOT_PATH,
+    SYMBOLS,
+    VOLUME_AVG_PERIOD,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
 
 logger = logging.getLogger(__name__)
 
 _conn: duckdb.DuckDBPyConnection | None = None
+_conn_lock = threading.Lock()
+
+# Per-thread cursors over _conn; DuckDB connections must not be shared across threads
+_local = threading.local()
+
+# Reader state: the snapshot file we have open, its mtime and when we last looked for a newer one
+_snapshot_name: str | None = None
+_snapshot_mtime: float | None = None
+_snapshot_checked = 0.0
+_snapshot_lock = threading.Lock()
+
+# Writer state: whether anything was written since the last published snapshot
+_dirty = True
+
+# Last data version handed out; see _next_version
+_last_version = 0
+_version_lock = threading.Lock()
+
+# Serialises versioned writes, so versions commit in the order they are stamped and
+# a `since` reader never misses a row committed after it saw a newer version
+_write_lock = threading.Lock()
+
+
+def is_read_only() -> bool:
+    """Whether this process serves snapshots instead of owning the database"""
+    return ROLE == "reader"
 
 
 def get_conn() -> duckdb.DuckDBPyConnection:
-    """Get or create DuckDB connection"""
+    """
+    Get this thread's DuckDB connection.
+
+    Each thread gets its own cursor over the process-wide connection (the latest
+    snapshot on readers), and a new one when that connection is replaced.
+    """
+    conn = _get_snapshot_conn() if is_read_only() else _get_writer_conn()
+
+    cached = getattr(_local, "cursor", None)
+    if cached is None or cached[0] is not conn:
+        cached = (conn, conn.cursor())
+        _local.cursor = cached
+    return cached[1]
+
+
+def _get_writer_conn() -> duckdb.DuckDBPyConnection:
+    """Get or create the connection to DB_PATH"""
     global _conn
     if _conn is None:
-        Path(DB_PATH).parent.mkdir(parents=True, exist_ok=True)
-        _conn = duckdb.connect(DB_PATH)
+        with _conn_lock:
+            if _conn is None:
+                Path(DB_PATH).parent.mkdir(parents=True, exist_ok=True)
+                _conn = duckdb.connect(DB_PATH)
     return _conn
 
 
+def _snapshot_pointer() -> Path:
+    """File naming the current snapshot; each snapshot is published under its own name"""
+    return Path(SNAPSHOT_PATH).with_suffix(".current")
+
+
+def _snapshot_file(name: str) -> Path:
+    return Path(SNAPSHOT_PATH).with_name(name)
+
+
+def _current_snapshot() -> str | None:
+    try:
+        return _snapshot_pointer().read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _get_snapshot_conn() -> duckdb.DuckDBPyConnection:
+    """
+    Get a read-only connection to the latest published snapshot.
+
+    Checks the snapshot pointer at most every SNAPSHOT_CHECK_INTERVAL seconds and
+    connects to the new file when it changes. DuckDB caches database instances by
+    path, which is why every snapshot gets its own file. The previous connection
+    is not closed explicitly, as that would abort queries still running on it;
+    it is released when the last of them drops its reference.
+    """
+    global _conn, _snapshot_name, _snapshot_mtime, _snapshot_checked
+
+    now = time.monotonic()
+    if _conn is not None and now - _snapshot_checked < SNAPSHOT_CHECK_INTERVAL:
+        return _conn
+
+    with _snapshot_lock:
+        _snapshot_checked = now
+        name = _current_snapshot()
+        if name is None:
+            if _conn is None:
+                raise RuntimeError(f"No snapshot published yet at {_snapshot_pointer()}")
+            return _conn
+
+        if name != _snapshot_name:
+            path = _snapshot_file(name)
+            _conn = duckdb.connect(str(path), read_only=True)
+            _snapshot_name = name
+            _snapshot_mtime = path.stat().st_mtime
+            logger.info(f"Opened snapshot {path}")
+
+            store = _live_store()
+            if store is not None:
+                store.clear()
+
+    return _conn
+
+
+def check_snapshot():
+    """On readers, switch to a newer snapshot if one was published since the last check"""
+    if is_read_only():
+        _get_snapshot_conn()
+
+
+def _live_store():
+    """The in-process live store, imported on first use to keep startup light"""
+    if LIVE_STORE_CAPACITY <= 0:
+        return None
+    from src.live_store import store
+
+    return store
+
+
+def _mark_written():
+    """Record that the database changed since the last snapshot"""
+    global _dirty
+    _dirty = True
+
+
+def snapshot_pending() -> bool:
+    """Whether there are writes not yet published to readers"""
+    return _dirty
+
+
+def publish_snapshot():
+    """
+    Copy the database to a new snapshot file for reader processes.
+
+    The copy is taken in a single transaction on its own cursor, then the pointer
+    file is atomically switched to it. Snapshots older than the previous one are
+    removed; readers still using them keep the open file until they switch.
+    """
+    global _dirty
+    pointer = _snapshot_pointer()
+    previous = _current_snapshot()
+    base = Path(SNAPSHOT_PATH)
+    name = f"{base.stem}.{_next_version()}{base.suffix}"
+    path = _snapshot_file(name)
+
+    _dirty = False
+    try:
+        with get_conn().cursor() as cur:
+            database = cur.execute("SELECT current_database()").fetchone()[0]
+            cur.execute(f"ATTACH '{path}' AS snapshot")
+            try:
+                cur.execute(f'COPY FROM DATABASE "{database}" TO snapshot')
+            finally:
+                cur.execute("DETACH snapshot")
+
+        tmp_pointer = pointer.with_suffix(".current.tmp")
+        tmp_pointer.write_text(name)
+        os.replace(tmp_pointer, pointer)
+    except Exception:
+        _dirty = True
+        path.unlink(missing_ok=True)
+        raise
+
+    keep = {name, previous}
+    for old in base.parent.glob(f"{base.stem}.*{base.suffix}"):
+        if old.name not in keep:
+            try:
+                old.unlink()
+            except OSError as e:
+                logger.warning(f"Could not remove old snapshot {old}: {e}")
+
+    logger.info(f"Published snapshot {path}")
+
+
+def get_snapshot_info() -> dict:
+    """
+    Describe the latest published snapshot and, on readers, the one being served.
+
+    A reader only switches on its next database access after SNAPSHOT_CHECK_INTERVAL,
+    so the two can differ briefly.
+    """
+    now = time.time()
+    name = _current_snapshot()
+    latest = None
+    if name is not None:
+        try:
+            latest = _snapshot_file(name).stat().st_mtime
+        except FileNotFoundError:
+            pass
+
+    return {
+        "published_at": latest,
+        "age_seconds": round(now - latest, 3) if latest else None,
+        "serving": _snapshot_name,
+        "serving_published_at": _snapshot_mtime,
+        "serving_age_seconds": round(now - _snapshot_mtime, 3) if _snapshot_mtime else None,
+    }
+
+
+# Bump whenever init_db's DDL or backfills change so existing databases rerun them
+SCHEMA_VERSION = 3
+
+
+def get_schema_version() -> int:
+    """Get the schema version recorded by init_db, 0 if never initialized"""
+    conn = get_conn()
+    try:
+        row = conn.execute("SELECT version FROM schema_version").fetchone()
+    except duckdb.CatalogException:
+        return 0
+    return row[0] if row else 0
+
+
 def init_db():
-    """Initialize database tables"""
+    """Initialize database tables, skipping the DDL when the schema is current"""
+    if get_schema_version() == SCHEMA_VERSION:
+        logger.info(f"Database schema is current (version {SCHEMA_VERSION})")
+        return
+
     conn = get_conn()
 
     conn.execute("""
@@ -39,6 +265,7 @@ def init_db():
             volume BIGINT,
             trade_count INTEGER,
             vwap DOUBLE,
+            version BIGINT DEFAULT 0,
             PRIMARY KEY (symbol, timestamp)
         )
     """)
@@ -54,6 +281,7 @@ def init_db():
             volume BIGINT,
             trade_count INTEGER,
             vwap DOUBLE,
+            version BIGINT DEFAULT 0,
             PRIMARY KEY (symbol, timestamp)
         )
     """)
@@ -66,11 +294,131 @@ def init_db():
             indicators JSON,
             signals JSON,
             data_points_used INTEGER,
+            version BIGINT DEFAULT 0,
             PRIMARY KEY (symbol, timeframe, timestamp)
         )
     """)
 
-    logger.info("Database tables initialized")
+    # Databases created before rows carried a write version
+    for table_name in (*TABLE_MAP.values(), "technical_analysis"):
+        conn.execute(
+            f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS version BIGINT DEFAULT 0"
+        )
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS data_versions (
+            symbol VARCHAR,
+            timeframe VARCHAR,
+            version BIGINT,
+            updated_at TIMESTAMPTZ,
+            PRIMARY KEY (symbol, timeframe)
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ingest_checkpoints (
+            job_id VARCHAR,
+            timeframe VARCHAR,
+            symbols VARCHAR,
+            page_token VARCHAR,
+            pages INTEGER,
+            row_count BIGINT,
+            status VARCHAR,
+            updated_at TIMESTAMPTZ,
+            PRIMARY KEY (job_id, timeframe, symbols)
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS signal_events (
+            symbol VARCHAR,
+            timeframe VARCHAR,
+            timestamp TIMESTAMPTZ,
+            signal VARCHAR,
+            direction TINYINT,
+            PRIMARY KEY (symbol, timeframe, timestamp, signal)
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS symbols (
+            symbol VARCHAR PRIMARY KEY,
+            added_at TIMESTAMPTZ
+        )
+    """)
+
+    # Derived from bars and technical_analysis, so recreated (and refilled below) on upgrade
+    conn.execute("DROP TABLE IF EXISTS latest_values")
+    conn.execute("""
+        CREATE TABLE latest_values (
+            symbol VARCHAR,
+            timeframe VARCHAR,
+            timestamp TIMESTAMPTZ,
+            close DOUBLE,
+            volume BIGINT,
+            volume_avg DOUBLE,
+            vwap DOUBLE,
+            ema9 DOUBLE,
+            macd DOUBLE,
+            macd_signal DOUBLE,
+            macd_histogram DOUBLE,
+            ema9_cross TINYINT,
+            macd_cross TINYINT,
+            histogram_cross TINYINT,
+            vwap_reclaim TINYINT,
+            PRIMARY KEY (symbol, timeframe)
+        )
+    """)
+
+    if conn.execute("SELECT COUNT(*) FROM symbols").fetchone()[0] == 0:
+        add_symbols(SYMBOLS)
+
+    # Rebuilt on every schema upgrade so rows follow the current refresh logic
+    pairs = conn.execute("SELECT DISTINCT symbol, timeframe FROM technical_analysis").fetchall()
+    for symbol, timeframe in pairs:
+        refresh_latest_values(symbol, timeframe)
+
+    conn.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER)")
+    conn.execute("DELETE FROM schema_version")
+    conn.execute("INSERT INTO schema_version VALUES (?)", [SCHEMA_VERSION])
+
+    logger.info(f"Database tables initialized (schema version {SCHEMA_VERSION})")
+
+
+def get_symbols() -> list[str]:
+    """Get the symbol universe, sorted."""
+    conn = get_conn()
+    result = conn.execute("SELECT symbol FROM symbols ORDER BY symbol").fetchall()
+    return [row[0] for row in result]
+
+
+def add_symbols(symbols: list[str]) -> int:
+    """Add symbols to the universe, ignoring ones already present."""
+    conn = get_conn()
+    normalized = sorted({s.strip().upper() for s in symbols if s.strip()})
+    existing = set(get_symbols())
+    new_symbols = [s for s in normalized if s not in existing]
+
+    if new_symbols:
+        conn.executemany(
+            "INSERT INTO symbols (symbol, added_at) VALUES (?, now())",
+            [[s] for s in new_symbols],
+        )
+        _mark_written()
+
+    logger.info(f"Added {len(new_symbols)} symbols to universe")
+    return len(new_symbols)
+
+
+def remove_symbol(symbol: str) -> bool:
+    """Remove a symbol from the universe. Returns False if it was not present."""
+    conn = get_conn()
+    result = conn.execute(
+        "DELETE FROM symbols WHERE symbol = ? RETURNING symbol", [symbol.upper()]
+    ).fetchall()
+    if result:
+        _mark_written()
+    return len(result) > 0
 
 
 TABLE_MAP = {
@@ -79,21 +427,58 @@ TABLE_MAP = {
 }
 
 
-def save_market_data(data: list[dict], timeframe: str) -> int:
-    """Save market data, ignoring conflicts."""
-    table_name = TABLE_MAP.get(timeframe)
-    if not table_name:
-        raise ValueError(f"Invalid timeframe: {timeframe}")
+def _next_version() -> int:
+    """Monotonic write stamp: microseconds since the epoch, never repeating"""
+    global _last_version
+    with _version_lock:
+        _last_version = max(_last_version + 1, time.time_ns() // 1000)
+        return _last_version
+
+
+def _bump_versions(conn: duckdb.DuckDBPyConnection, keys: set[tuple[str, str]], version: int):
+    """Stamp (symbol, timeframe) pairs with the version of their latest write; never lowers it."""
+    conn.executemany(
+        """
+        INSERT INTO data_versions (symbol, timeframe, version, updated_at)
+        VALUES (?, ?, ?, now())
+        ON CONFLICT (symbol, timeframe) DO UPDATE SET
+            version = greatest(data_versions.version, excluded.version),
+            updated_at = excluded.updated_at
+    """,
+        [[symbol, timeframe, version] for symbol, timeframe in keys],
+    )
+
 
+def get_data_version(symbol: str, timeframe: str) -> int:
+    """Get the version of the latest bar or indicator write, 0 if never written."""
     conn = get_conn()
+    row = conn.execute(
+        "SELECT version FROM data_versions WHERE symbol = ? AND timeframe = ?",
+        [symbol, timeframe],
+    ).fetchone()
+    return row[0] if row else 0
 
-    for row in data:
-        conn.execute(
-            f"""
-            INSERT OR REPLACE INTO {table_name}
-            (symbol, timestamp, open, high, low, close, volume, trade_count, vwap)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
+
+def _insert_market_data(
+    conn: duckdb.DuckDBPyConnection, timeframe: str, data: list[dict]
+) -> int | None:
+    """
+    Upsert bar rows and bump their data versions; returns the version written.
+
+    Callers hold _write_lock until the write is committed.
+    """
+    if not data:
+        return None
+
+    _mark_written()
+    version = _next_version()
+    conn.executemany(
+        f"""
+        INSERT OR REPLACE INTO {TABLE_MAP[timeframe]}
+        (symbol, timestamp, open, high, low, close, volume, trade_count, vwap, version)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+        [
             [
                 row["symbol"],
                 row["timestamp"],
@@ -104,15 +489,152 @@ def save_market_data(data: list[dict], timeframe: str) -> int:
                 row["volume"],
                 row["trade_count"],
                 row["vwap"],
-            ],
-        )
+                version,
+            ]
+            for row in data
+        ],
+    )
+    _bump_versions(conn, {(row["symbol"], timeframe) for row in data}, version)
+    return version
+
+
+def save_market_data(data: list[dict], timeframe: str) -> int:
+    """Save market data, ignoring conflicts."""
+    table_name = TABLE_MAP.get(timeframe)
+    if not table_name:
+        raise ValueError(f"Invalid timeframe: {timeframe}")
+
+    with _write_lock:
+        version = _insert_market_data(get_conn(), timeframe, data)
+
+        store = _live_store()
+        if store is not None and version is not None:
+            store.on_bars(timeframe, data, version)
 
     logger.info(f"Saved {len(data)} records to {table_name}")
     return len(data)
 
 
-def get_market_data(symbol: str, timeframe: str) -> list[dict]:
-    """Get market data for a symbol and timeframe."""
+def get_checkpoint(job_id: str, timeframe: str, symbols: str) -> dict | None:
+    """Get the ingestion checkpoint for a job, timeframe and symbol set."""
+    conn = get_conn()
+    row = conn.execute(
+        """
+        SELECT job_id, timeframe, symbols, page_token, pages, row_count, status, updated_at
+        FROM ingest_checkpoints
+        WHERE job_id = ? AND timeframe = ? AND symbols = ?
+    """,
+        [job_id, timeframe, symbols],
+    ).fetchone()
+
+    if row is None:
+        return None
+
+    return {
+        "job_id": row[0],
+        "timeframe": row[1],
+        "symbols": row[2],
+        "page_token": row[3],
+        "pages": row[4],
+        "row_count": row[5],
+        "status": row[6],
+        "updated_at": row[7],
+    }
+
+
+def get_checkpoints(job_id: str, timeframe: str | None = None) -> list[dict]:
+    """Get every shard checkpoint recorded for a job, optionally for one timeframe."""
+    conditions = ["job_id = ?"]
+    params: list = [job_id]
+    if timeframe is not None:
+        conditions.append("timeframe = ?")
+        params.append(timeframe)
+
+    conn = get_conn()
+    rows = conn.execute(
+        f"""
+        SELECT timeframe, symbols, pages, row_count, status
+        FROM ingest_checkpoints
+        WHERE {" AND ".join(conditions)}
+        ORDER BY timeframe, symbols
+    """,
+        params,
+    ).fetchall()
+    return [
+        {
+            "timeframe": row[0],
+            "symbols": row[1],
+            "pages": row[2],
+            "row_count": row[3],
+            "status": row[4],
+        }
+        for row in rows
+    ]
+
+
+def delete_checkpoints(job_id: str) -> int:
+    """Forget every checkpoint of a job so its next run starts from page 1."""
+    conn = get_conn()
+    result = conn.execute(
+        "DELETE FROM ingest_checkpoints WHERE job_id = ? RETURNING job_id", [job_id]
+    ).fetchall()
+    return len(result)
+
+
+def save_page_with_checkpoint(data: list[dict], timeframe: str, checkpoint: dict) -> int:
+    """
+    Save one page of market data and its ingestion checkpoint atomically.
+
+    Either both the rows and the advanced checkpoint are committed, or neither is,
+    so a restarted job never skips or double-counts a page.
+    """
+    table_name = TABLE_MAP.get(timeframe)
+    if not table_name:
+        raise ValueError(f"Invalid timeframe: {timeframe}")
+
+    with _write_lock, get_conn().cursor() as cur:
+        cur.begin()
+        try:
+            version = _insert_market_data(cur, timeframe, data)
+            cur.execute(
+                """
+                INSERT OR REPLACE INTO ingest_checkpoints
+                (job_id, timeframe, symbols, page_token, pages, row_count, status, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, now())
+            """,
+                [
+                    checkpoint["job_id"],
+                    timeframe,
+                    checkpoint["symbols"],
+                    checkpoint.get("page_token"),
+                    checkpoint["pages"],
+                    checkpoint["row_count"],
+                    checkpoint["status"],
+                ],
+            )
+            cur.commit()
+        except Exception:
+            cur.rollback()
+            raise
+
+        store = _live_store()
+        if store is not None and version is not None:
+            store.on_bars(timeframe, data, version)
+
+    _mark_written()
+    return len(data)
+
+
+def get_market_data(
+    symbol: str, timeframe: str, since: int | None = None, limit: int | None = None
+) -> list[dict]:
+    """
+    Get market data for a symbol and timeframe.
+
+    Args:
+        since: Only return bars written after this data version
+        limit: Only return the latest `limit` bars
+    """
     table_name = TABLE_MAP.get(timeframe)
     if not table_name:
         raise ValueError(f"Invalid timeframe: {timeframe}")
@@ -120,12 +642,16 @@ def get_market_data(symbol: str, timeframe: str) -> list[dict]:
     conn = get_conn()
     result = conn.execute(
         f"""
-        SELECT symbol, timestamp, open, high, low, close, volume, trade_count, vwap
-        FROM {table_name}
-        WHERE symbol = ?
+        SELECT * FROM (
+            SELECT symbol, timestamp, open, high, low, close, volume, trade_count, vwap
+            FROM {table_name}
+            WHERE symbol = ? AND version > ?
+            ORDER BY timestamp DESC
+            {f"LIMIT {int(limit)}" if limit else ""}
+        )
         ORDER BY timestamp ASC
     """,
-        [symbol],
+        [symbol, since or -1],
     ).fetchall()
 
     return [
@@ -144,17 +670,27 @@ def get_market_data(symbol: str, timeframe: str) -> list[dict]:
     ]
 
 
-def save_technical_analysis(data: list[dict]) -> int:
-    """Save technical analysis results."""
-    conn = get_conn()
-
-    for row in data:
-        conn.execute(
-            """
-            INSERT OR REPLACE INTO technical_analysis
-            (symbol, timeframe, timestamp, indicators, signals, data_points_used)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """,
+def _upsert_technical_analysis(
+    conn: duckdb.DuckDBPyConnection, data: list[dict], version: int
+) -> set[tuple[str, str]]:
+    """Upsert analysis rows and bump versions; returns the (symbol, timeframe) pairs changed."""
+    conn.executemany(
+        """
+        INSERT INTO technical_analysis
+        (symbol, timeframe, timestamp, indicators, signals, data_points_used, version)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (symbol, timeframe, timestamp) DO UPDATE SET
+            indicators = excluded.indicators,
+            signals = excluded.signals,
+            data_points_used = excluded.data_points_used,
+            version = CASE
+                WHEN indicators IS DISTINCT FROM excluded.indicators
+                    OR signals IS DISTINCT FROM excluded.signals
+                THEN excluded.version
+                ELSE version
+            END
+    """,
+        [
             [
                 row["symbol"],
                 row["timeframe"],
@@ -162,24 +698,210 @@ def save_technical_analysis(data: list[dict]) -> int:
                 json.dumps(row.get("indicators")),
                 json.dumps(row.get("signals")) if row.get("signals") else None,
                 row.get("data_points_used"),
-            ],
-        )
+                version,
+            ]
+            for row in data
+        ],
+    )
+    changed = set(
+        conn.execute(
+            "SELECT DISTINCT symbol, timeframe FROM technical_analysis WHERE version = ?",
+            [version],
+        ).fetchall()
+    )
+    if changed:
+        _bump_versions(conn, changed, version)
+    return changed
+
+
+def save_technical_analysis(data: list[dict]) -> int:
+    """
+    Save technical analysis results and refresh the screener's latest values.
+
+    Rows whose indicators and signals are unchanged keep their version, so
+    recalculating a full history only shows up in `since` deltas where it differs.
+    """
+    changed: set[tuple[str, str]] = set()
+
+    with _write_lock:
+        if data:
+            version = _next_version()
+            with get_conn().cursor() as cur:
+                cur.begin()
+                try:
+                    changed = _upsert_technical_analysis(cur, data, version)
+                    cur.commit()
+                except Exception:
+                    cur.rollback()
+                    raise
+
+        if changed:
+            store = _live_store()
+            if store is not None:
+                store.on_indicators(
+                    [row for row in data if (row["symbol"], row["timeframe"]) in changed], version
+                )
 
-    logger.info(f"Saved {len(data)} technical analysis records")
+            for symbol, timeframe in changed:
+                refresh_latest_values(symbol, timeframe)
+
+    _mark_written()
+
+    logger.info(f"Saved {len(data)} technical analysis records, {len(changed)} series changed")
     return len(data)
 
 
-def get_technical_analysis(symbol: str, timeframe: str) -> list[dict]:
-    """Get technical analysis data for a symbol and timeframe."""
+def refresh_latest_values(symbol: str, timeframe: str):
+    """
+    Rebuild the latest_values row for a symbol and timeframe.
+
+    Keeps the newest bar that has indicators, its crossover flags as stored by the
+    signal pass (so /screen agrees with /signals) and the average volume of the
+    VOLUME_AVG_PERIOD bars before it, so screens never touch the full history.
+    Bars ingested after the last indicator run are ignored until indicators catch up.
+    """
+    table_name = TABLE_MAP.get(timeframe)
+    if not table_name:
+        raise ValueError(f"Invalid timeframe: {timeframe}")
+
     conn = get_conn()
-    result = conn.execute(
+    rows = conn.execute(
+        f"""
+        WITH latest AS (
+            SELECT MAX(timestamp) AS timestamp
+            FROM technical_analysis
+            WHERE symbol = ? AND timeframe = ?
+        ),
+        recent AS (
+            SELECT timestamp, close, volume, vwap
+            FROM {table_name}
+            WHERE symbol = ? AND timestamp <= (SELECT timestamp FROM latest)
+            ORDER BY timestamp DESC
+            LIMIT {VOLUME_AVG_PERIOD + 1}
+        ),
+        bars AS (
+            SELECT *, AVG(volume) OVER (
+                ORDER BY timestamp ROWS BETWEEN {VOLUME_AVG_PERIOD} PRECEDING AND 1 PRECEDING
+            ) AS volume_avg
+            FROM recent
+        )
+        SELECT
+            bars.timestamp, bars.close, bars.volume, bars.volume_avg, bars.vwap,
+            CAST(ta.indicators->>'$.EMA9' AS DOUBLE),
+            CAST(ta.indicators->>'$.MACD.macd' AS DOUBLE),
+            CAST(ta.indicators->>'$.MACD.signal' AS DOUBLE),
+            CAST(ta.indicators->>'$.MACD.histogram' AS DOUBLE),
+            COALESCE(CAST(ta.signals->>'$.ema9_cross' AS TINYINT), 0),
+            COALESCE(CAST(ta.signals->>'$.macd_cross' AS TINYINT), 0),
+            COALESCE(CAST(ta.signals->>'$.histogram_cross' AS TINYINT), 0),
+            COALESCE(CAST(ta.signals->>'$.vwap_reclaim' AS TINYINT), 0)
+        FROM bars
+        JOIN technical_analysis ta
+            ON ta.symbol = ? AND ta.timeframe = ? AND ta.timestamp = bars.timestamp
+        ORDER BY bars.timestamp DESC
+        LIMIT 1
+    """,
+        [symbol, timeframe, symbol, symbol, timeframe],
+    ).fetchall()
+
+    if not rows:
+        return
+
+    conn.execute(
         """
+        INSERT OR REPLACE INTO latest_values
+        (symbol, timeframe, timestamp, close, volume, volume_avg, vwap,
+         ema9, macd, macd_signal, macd_histogram,
+         ema9_cross, macd_cross, histogram_cross, vwap_reclaim)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+        [symbol, timeframe, *rows[0]],
+    )
+
+
+# Screener filters: (name, value) -> predicate over latest_values
+SCREEN_PREDICATES = {
+    ("close_vs_ema9", "above"): "close > ema9",
+    ("close_vs_ema9", "below"): "close < ema9",
+    ("ema9_cross", "up"): "ema9_cross = 1",
+    ("ema9_cross", "down"): "ema9_cross = -1",
+    ("macd_cross", "up"): "macd_cross = 1",
+    ("macd_cross", "down"): "macd_cross = -1",
+    ("histogram_cross", "up"): "histogram_cross = 1",
+    ("histogram_cross", "down"): "histogram_cross = -1",
+    ("vwap_reclaim", "up"): "vwap_reclaim = 1",
+    ("vwap_reclaim", "down"): "vwap_reclaim = -1",
+}
+
+
+def screen_latest_values(
+    timeframe: str, filters: dict[str, str], min_volume_ratio: float | None = None
+) -> list[dict]:
+    """
+    Run screener predicates across the universe's latest values for a timeframe.
+
+    Args:
+        timeframe: Timeframe to screen
+        filters: Mapping of filter name -> value, keys of SCREEN_PREDICATES
+        min_volume_ratio: Keep only symbols whose volume is at least this multiple
+            of their rolling average
+
+    Returns:
+        Matching latest_values rows
+    """
+    conditions = ["timeframe = ?", "symbol IN (SELECT symbol FROM symbols)"]
+    params: list = [timeframe]
+
+    for name, value in filters.items():
+        predicate = SCREEN_PREDICATES.get((name, value))
+        if predicate is None:
+            raise ValueError(f"Invalid screen filter: {name}={value}")
+        conditions.append(f"({predicate})")
+
+    if min_volume_ratio is not None:
+        conditions.append("volume >= ? * volume_avg")
+        params.append(min_volume_ratio)
+
+    conn = get_conn()
+    cursor = conn.execute(
+        f"""
+        SELECT symbol, timestamp, close, volume, volume_avg, vwap,
+               ema9, macd, macd_signal, macd_histogram
+        FROM latest_values
+        WHERE {" AND ".join(conditions)}
+        ORDER BY symbol
+    """,
+        params,
+    )
+    columns = [desc[0] for desc in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def get_technical_analysis(
+    symbol: str, timeframe: str, since: int | None = None, start=None
+) -> list[dict]:
+    """
+    Get technical analysis data for a symbol and timeframe.
+
+    Args:
+        since: Only return rows written after this data version
+        start: Only return rows at or after this timestamp
+    """
+    conditions = ["symbol = ?", "timeframe = ?", "version > ?"]
+    params: list = [symbol, timeframe, since or -1]
+    if start is not None:
+        conditions.append("timestamp >= ?")
+        params.append(start)
+
+    conn = get_conn()
+    result = conn.execute(
+        f"""
         SELECT symbol, timeframe, timestamp, indicators, signals, data_points_used
         FROM technical_analysis
-        WHERE symbol = ? AND timeframe = ?
+        WHERE {" AND ".join(conditions)}
         ORDER BY timestamp ASC
     """,
-        [symbol, timeframe],
+        params,
     ).fetchall()
 
     return [
@@ -195,6 +917,183 @@ def get_technical_analysis(symbol: str, timeframe: str) -> list[dict]:
     ]
 
 
+def get_latest_ta_timestamp(symbol: str, timeframe: str):
+    """Get the timestamp of the newest technical analysis row, or None."""
+    conn = get_conn()
+    return conn.execute(
+        "SELECT MAX(timestamp) FROM technical_analysis WHERE symbol = ? AND timeframe = ?",
+        [symbol, timeframe],
+    ).fetchone()[0]
+
+
+def save_signal_events(symbol: str, timeframe: str, since, events: list[tuple]) -> int:
+    """
+    Replace signal events for a symbol and timeframe from `since` onwards.
+
+    Args:
+        since: Timestamp of the first evaluated bar; older events are kept
+        events: (timestamp, signal, direction) tuples
+    """
+    with get_conn().cursor() as cur:
+        cur.begin()
+        try:
+            cur.execute(
+                "DELETE FROM signal_events WHERE symbol = ? AND timeframe = ? AND timestamp >= ?",
+                [symbol, timeframe, since],
+            )
+            if events:
+                cur.executemany(
+                    """
+                    INSERT INTO signal_events (symbol, timeframe, timestamp, signal, direction)
+                    VALUES (?, ?, ?, ?, ?)
+                """,
+                    [[symbol, timeframe, ts, name, direction] for ts, name, direction in events],
+                )
+            cur.commit()
+        except Exception:
+            cur.rollback()
+            raise
+
+    _mark_written()
+    logger.info(f"Saved {len(events)} signal events for {symbol} ({timeframe})")
+    return len(events)
+
+
+def get_signal_events(
+    symbol: str, timeframe: str, signal: str | None = None, limit: int | None = None
+) -> list[dict]:
+    """Get signal events for a symbol and timeframe, newest first."""
+    conditions = ["symbol = ?", "timeframe = ?"]
+    params: list = [symbol, timeframe]
+    if signal:
+        conditions.append("signal = ?")
+        params.append(signal)
+
+    conn = get_conn()
+    result = conn.execute(
+        f"""
+        SELECT timestamp, signal, direction
+        FROM signal_events
+        WHERE {" AND ".join(conditions)}
+        ORDER BY timestamp DESC, signal
+        {f"LIMIT {int(limit)}" if limit else ""}
+    """,
+        params,
+    ).fetchall()
+
+    return [{"timestamp": row[0], "signal": row[1], "direction": row[2]} for row in result]
+
+
+def get_backtest_series(symbols: list[str], timeframe: str) -> dict[str, dict[str, "np.ndarray"]]:
+    """
+    Read bars joined with their indicators as columnar NumPy arrays, per symbol.
+
+    One query covers all symbols; rows are split on symbol boundaries without
+    building per-bar Python objects. Missing indicator values come back as NaN.
+    """
+    import numpy as np
+
+    table_name = TABLE_MAP.get(timeframe)
+    if not table_name:
+        raise ValueError(f"Invalid timeframe: {timeframe}")
+    if not symbols:
+        return {}
+
+    conn = get_conn()
+    columns = conn.execute(
+        f"""
+        SELECT
+            b.symbol,
+            epoch(b.timestamp)::BIGINT AS time,
+            b.open,
+            b.close,
+            CAST(ta.indicators->>'$.EMA9' AS DOUBLE) AS ema9,
+            CAST(ta.indicators->>'$.MACD.macd' AS DOUBLE) AS macd,
+            CAST(ta.indicators->>'$.MACD.signal' AS DOUBLE) AS macd_signal
+        FROM {table_name} b
+        JOIN technical_analysis ta
+            ON ta.symbol = b.symbol AND ta.timeframe = ? AND ta.timestamp = b.timestamp
+        WHERE b.symbol IN ({", ".join("?" for _ in symbols)})
+        ORDER BY b.symbol, b.timestamp
+    """,
+        [timeframe, *symbols],
+    ).fetchnumpy()
+
+    arrays = {
+        name: np.ma.filled(np.ma.asarray(values, dtype=np.float64), np.nan)
+        for name, values in columns.items()
+        if name not in ("symbol", "time")
+    }
+    arrays["time"] = np.asarray(columns["time"], dtype=np.int64)
+
+    # Rows are ordered by symbol, so unique's first-occurrence indices are ascending
+    names, starts = np.unique(np.asarray(columns["symbol"]), return_index=True)
+    ends = list(starts[1:]) + [len(arrays["time"])]
+
+    return {
+        str(symbol): {name: values[start:end] for name, values in arrays.items()}
+        for symbol, start, end in zip(names, starts, ends)
+    }
+
+
+def get_live_window(timeframe: str, symbols: list[str], limit: int) -> dict[str, "np.ndarray"]:
+    """
+    Read the latest `limit` bars per symbol with their indicators as NumPy columns.
+
+    Rows are ordered by symbol then timestamp. `total` is each symbol's full bar
+    count, `has_ta` marks bars with stored indicators, and `version` is the
+    symbol's data version. Missing values come back as NaN.
+    """
+    import numpy as np
+
+    table_name = TABLE_MAP.get(timeframe)
+    if not table_name:
+        raise ValueError(f"Invalid timeframe: {timeframe}")
+
+    conn = get_conn()
+    columns = conn.execute(
+        f"""
+        WITH recent AS (
+            SELECT *,
+                row_number() OVER (PARTITION BY symbol ORDER BY timestamp DESC) AS rn,
+                COUNT(*) OVER (PARTITION BY symbol) AS total
+            FROM {table_name}
+            WHERE symbol IN ({", ".join("?" for _ in symbols)})
+        )
+        SELECT
+            b.symbol,
+            epoch(b.timestamp)::BIGINT AS time,
+            b.open, b.high, b.low, b.close,
+            b.volume::DOUBLE AS volume,
+            b.vwap,
+            ta.timestamp IS NOT NULL AS has_ta,
+            CAST(ta.indicators->>'$.EMA9' AS DOUBLE) AS ema9,
+            CAST(ta.indicators->>'$.MACD.macd' AS DOUBLE) AS macd,
+            CAST(ta.indicators->>'$.MACD.signal' AS DOUBLE) AS macd_signal,
+            CAST(ta.indicators->>'$.MACD.histogram' AS DOUBLE) AS macd_histogram,
+            b.total,
+            COALESCE(v.version, 0) AS version
+        FROM recent b
+        LEFT JOIN technical_analysis ta
+            ON ta.symbol = b.symbol AND ta.timeframe = ? AND ta.timestamp = b.timestamp
+        LEFT JOIN data_versions v
+            ON v.symbol = b.symbol AND v.timeframe = ?
+        WHERE b.rn <= ?
+        ORDER BY b.symbol, b.timestamp
+    """,
+        [*symbols, timeframe, timeframe, limit],
+    ).fetchnumpy()
+
+    return {
+        name: (
+            np.asarray(values)
+            if name in ("symbol", "time", "has_ta", "total", "version")
+            else np.ma.filled(np.ma.asarray(values, dtype=np.float64), np.nan)
+        )
+        for name, values in columns.items()
+    }
+
+
 def get_db_size() -> dict:
     """Get database size info"""
     path = Path(DB_PATH)
@@ -0,0 +1,39 @@
+"""
+Indicator calculations using TA-Lib.
+
+Imported on first use by the API so server startup does not pay for loading
+numpy and the TA-Lib native library.
+"""
+from typing import Dict, List
+
+import numpy as np
+import talib
+
+
+def clean_nan(arr: np.ndarray) -> List:
+    """Convert NaN values to None for JSON serialization"""
+    return [None if (isinstance(x, float) and np.isnan(x)) else x for x in arr.tolist()]
+
+
+def calculate_ema(close: np.ndarray, period: int = 9) -> Dict[str, List]:
+    result = talib.EMA(close, timeperiod=period)
+    return {"values": clean_nan(result)}
+
+
+def calculate_macd(
+    close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9
+) -> Dict[str, List]:
+    macd, signal_line, histogram = talib.MACD(
+        close, fastperiod=fast, slowperiod=slow, signalperiod=signal
+    )
+    return {
+        "macd": clean_nan(macd),
+        "signal": clean_nan(signal_line),
+        "histogram": clean_nan(histogram),
+    }
+
+
+INDICATOR_FUNCTIONS = {
+    "EMA": calculate_ema,
+    "MACD": calculate_macd,
+}
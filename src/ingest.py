@@ -0,0 +1,163 @@
+"""
+Resumable market data ingestion with per-page checkpoints
+"""
+import asyncio
+import logging
+from typing import Optional
+
+from src import db
+from src.data_client import DataClient, shard_symbols
+
+logger = logging.getLogger(__name__)
+
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+
+
+def make_job_id(start: str, end: str) -> str:
+    """Jobs are identified by their date range, so re-running a range resumes it."""
+    return f"{start}/{end}"
+
+
+def start_job(start: str, end: str, refresh: bool = False) -> bool:
+    """
+    Prepare a run of a job before ingesting any of its timeframes.
+
+    A job is complete once every (timeframe, shard) checkpoint it recorded is done;
+    running a complete job again, or passing `refresh`, starts it over. Otherwise
+    the run resumes: finished shards are skipped and interrupted ones continue from
+    their last committed page.
+
+    Returns:
+        True if the run resumes an unfinished job
+    """
+    job_id = make_job_id(start, end)
+    checkpoints = db.get_checkpoints(job_id)
+    complete = all(c["status"] == STATUS_DONE for c in checkpoints)
+
+    if checkpoints and (refresh or complete):
+        db.delete_checkpoints(job_id)
+        logger.info(f"Starting {job_id} over ({'refresh' if refresh else 'already complete'})")
+        return False
+    return bool(checkpoints)
+
+
+async def ingest_range(
+    client: DataClient,
+    start: str,
+    end: str,
+    timeframe: str,
+    symbols: Optional[list[str]] = None,
+) -> dict:
+    """
+    Ingest bars for a date range and timeframe across a symbol universe.
+
+    The universe is sharded into request-sized symbol batches which are fetched
+    concurrently; the client's scheduler keeps the combined rate within quota.
+    Each shard commits every page together with its checkpoint, so after a failure
+    a re-run of the same range resumes each shard from its last committed page and
+    skips shards that already finished. Call start_job once per run first, which
+    decides whether the job resumes or starts over.
+
+    An empty universe ingests nothing; `symbols=None` uses the client's symbols.
+
+    Returns:
+        {"count": rows, "pages": pages, "shards": shard count, "resumed": bool}
+    """
+    universe = sorted(client.symbols if symbols is None else symbols)
+    if not universe:
+        logger.info(f"Symbol universe is empty, nothing to ingest for {timeframe}")
+        return {"count": 0, "pages": 0, "shards": 0, "resumed": False}
+
+    shards = plan_shards(make_job_id(start, end), timeframe, universe)
+    results = await asyncio.gather(
+        *(_ingest_shard(client, start, end, timeframe, shard) for shard in shards),
+        return_exceptions=True,
+    )
+
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors:
+        logger.error(f"{len(errors)}/{len(shards)} shards failed for {timeframe}")
+        raise errors[0]
+
+    return {
+        "count": sum(r["count"] for r in results),
+        "pages": sum(r["pages"] for r in results),
+        "shards": len(shards),
+        "resumed": any(r["resumed"] for r in results),
+    }
+
+
+def plan_shards(job_id: str, timeframe: str, universe: list[str]) -> list[list[str]]:
+    """
+    Decide the symbol shards for a job.
+
+    Checkpoints are keyed by shard membership, so an unfinished job keeps the shard
+    plan recorded in its checkpoints even if the universe changed since; symbols
+    added in the meantime get shards of their own. Symbols removed in the meantime
+    are still fetched until the job completes, since a provider page_token is only
+    valid for the symbol set it was issued for. Timeframes without checkpoints are
+    planned afresh.
+    """
+    checkpoints = db.get_checkpoints(job_id, timeframe)
+    if not checkpoints:
+        return shard_symbols(universe)
+
+    shards = [c["symbols"].split(",") for c in checkpoints]
+    planned = {symbol for shard in shards for symbol in shard}
+    shards += shard_symbols([s for s in universe if s not in planned])
+    logger.info(f"Resuming {job_id} ({timeframe}) with its recorded {len(checkpoints)}-shard plan")
+    return shards
+
+
+async def _ingest_shard(
+    client: DataClient, start: str, end: str, timeframe: str, symbols: list[str]
+) -> dict:
+    """
+    Ingest one symbol batch, committing each page with its checkpoint.
+
+    If a previous run of the same job stopped midway, fetching resumes from the
+    last committed page_token; a shard that already finished is not fetched again.
+    """
+    job_id = make_job_id(start, end)
+    symbols_key = ",".join(symbols)
+
+    checkpoint = db.get_checkpoint(job_id, timeframe, symbols_key)
+    if checkpoint is not None and checkpoint["status"] == STATUS_DONE:
+        logger.info(f"Skipping finished shard of {job_id} ({timeframe}, {symbols_key})")
+        return {"count": checkpoint["row_count"], "pages": checkpoint["pages"], "resumed": True}
+
+    resumed = checkpoint is not None
+
+    if resumed:
+        page_token = checkpoint["page_token"]
+        pages = checkpoint["pages"]
+        row_count = checkpoint["row_count"]
+        logger.info(f"Resuming {job_id} ({timeframe}) after page {pages}, {row_count} rows")
+    else:
+        page_token = None
+        pages = 0
+        row_count = 0
+
+    async for bars_data, next_token in client.iter_pages(
+        start, end, timeframe, page_token, symbols
+    ):
+        formatted_data = client.transform_bars(bars_data)
+        pages += 1
+        row_count += len(formatted_data)
+
+        db.save_page_with_checkpoint(
+            formatted_data,
+            timeframe,
+            {
+                "job_id": job_id,
+                "symbols": symbols_key,
+                "page_token": next_token,
+                "pages": pages,
+                "row_count": row_count,
+                "status": STATUS_RUNNING if next_token else STATUS_DONE,
+            },
+        )
+
+    logger.info(f"Ingested {row_count} records for {job_id} ({timeframe}, {symbols_key})")
+    return {"count": row_count, "pages": pages, "resumed": resumed}
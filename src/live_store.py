@@ -0,0 +1,310 @@
+"""
+In-process store of the most recent bars and indicators.
+
+Keeps, per (symbol, timeframe), a fixed-capacity NumPy ring buffer of the latest
+LIVE_STORE_CAPACITY bars in one structured array, so hot `/data` reads skip
+DuckDB and per-row Python objects. Memory use is
+BAR_DTYPE.itemsize * capacity * (symbols x timeframes).
+"""
+import logging
+import threading
+from typing import Optional
+
+import numpy as np
+
+from src import db
+from src.config import LIVE_STORE_CAPACITY, TABLE_MAP
+
+logger = logging.getLogger(__name__)
+
+BAR_DTYPE = np.dtype(
+    [
+        ("time", "i8"),
+        ("open", "f8"),
+        ("high", "f8"),
+        ("low", "f8"),
+        ("close", "f8"),
+        ("volume", "f8"),
+        ("vwap", "f8"),
+        ("has_ta", "?"),
+        ("ema9", "f8"),
+        ("macd", "f8"),
+        ("macd_signal", "f8"),
+        ("macd_histogram", "f8"),
+    ]
+)
+
+BAR_FIELDS = ("open", "high", "low", "close", "volume", "vwap")
+INDICATOR_FIELDS = ("ema9", "macd", "macd_signal", "macd_histogram")
+
+
+class RingBuffer:
+    """Fixed-capacity, time-ordered buffer of the latest bars for one (symbol, timeframe)"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.rows = np.zeros(capacity, dtype=BAR_DTYPE)
+        self.head = 0  # physical index of the oldest row
+        self.count = 0
+        self.complete = True  # holds the key's entire history
+        self.version = 0
+
+    def _positions(self, start: int, stop: int) -> np.ndarray:
+        return (self.head + np.arange(start, stop)) % self.capacity
+
+    def latest(self, n: Optional[int] = None) -> np.ndarray:
+        """Copy of the latest `n` rows (all rows if None), oldest first."""
+        n = self.count if n is None else min(n, self.count)
+        return self.rows[self._positions(self.count - n, self.count)]
+
+    def times(self) -> np.ndarray:
+        return self.rows["time"][self._positions(0, self.count)]
+
+    def fits(self, limit: Optional[int]) -> bool:
+        """Whether a request for the latest `limit` bars can be answered from here."""
+        return self.complete or (limit is not None and limit <= self.count)
+
+    def extend(self, new: np.ndarray):
+        """Append rows newer than everything buffered, evicting the oldest."""
+        k = len(new)
+        if k == 0:
+            return
+        if k >= self.capacity:
+            self.complete = self.complete and self.count == 0 and k == self.capacity
+            self.rows[:] = new[-self.capacity:]
+            self.head, self.count = 0, self.capacity
+            return
+
+        self.rows[self._positions(self.count, self.count + k)] = new
+        overflow = max(0, self.count + k - self.capacity)
+        if overflow:
+            self.head = (self.head + overflow) % self.capacity
+            self.complete = False
+        self.count = min(self.capacity, self.count + k)
+
+    def upsert_bars(self, new: np.ndarray) -> bool:
+        """
+        Apply saved bars: update buffered timestamps in place and append newer ones.
+
+        Returns False if the rows cannot be absorbed (a gap fill inside the window,
+        or older history for a buffer holding everything) and the buffer must be
+        reloaded.
+        """
+        if self.count:
+            times = self.times()
+            older = new[new["time"] <= times[-1]]
+            new = new[new["time"] > times[-1]]
+
+            if len(older):
+                pos = np.searchsorted(times, older["time"])
+                found = times[np.minimum(pos, self.count - 1)] == older["time"]
+                before_window = older["time"] < times[0]
+                if np.any(~found & ~before_window) or (self.complete and before_window.any()):
+                    return False
+
+                targets = (self.head + pos[found]) % self.capacity
+                for field in BAR_FIELDS:
+                    self.rows[field][targets] = older[field][found]
+
+        self.extend(new)
+        return True
+
+    def upsert_indicators(self, new: np.ndarray):
+        """Set indicator values for buffered timestamps; others are outside the window."""
+        if not self.count or not len(new):
+            return
+
+        times = self.times()
+        pos = np.searchsorted(times, new["time"])
+        found = times[np.minimum(pos, self.count - 1)] == new["time"]
+        targets = (self.head + pos[found]) % self.capacity
+        for field in INDICATOR_FIELDS:
+            self.rows[field][targets] = new[field][found]
+        self.rows["has_ta"][targets] = True
+
+
+def _to_float(value) -> float:
+    return np.nan if value is None else value
+
+
+def bars_to_array(data: list[dict]) -> np.ndarray:
+    """Convert save_market_data rows to a time-sorted structured array, last write wins."""
+    rows = np.zeros(len(data), dtype=BAR_DTYPE)
+    rows["time"] = [int(row["timestamp"].timestamp()) for row in data]
+    for field in BAR_FIELDS:
+        rows[field] = [_to_float(row[field]) for row in data]
+    for field in INDICATOR_FIELDS:
+        rows[field] = np.nan
+    return _dedupe(rows)
+
+
+def indicators_to_array(data: list[dict]) -> np.ndarray:
+    """Convert save_technical_analysis rows to a time-sorted structured array."""
+    rows = np.zeros(len(data), dtype=BAR_DTYPE)
+    rows["time"] = [int(row["timestamp"].timestamp()) for row in data]
+    indicators = [row.get("indicators") or {} for row in data]
+    macd = [ind.get("MACD") or {} for ind in indicators]
+    rows["ema9"] = [_to_float(ind.get("EMA9")) for ind in indicators]
+    rows["macd"] = [_to_float(m.get("macd")) for m in macd]
+    rows["macd_signal"] = [_to_float(m.get("signal")) for m in macd]
+    rows["macd_histogram"] = [_to_float(m.get("histogram")) for m in macd]
+    rows["has_ta"] = True
+    return _dedupe(rows)
+
+
+def _dedupe(rows: np.ndarray) -> np.ndarray:
+    rows = rows[np.argsort(rows["time"], kind="stable")]
+    keep = np.append(rows["time"][1:] != rows["time"][:-1], True)
+    return rows[keep]
+
+
+class LiveStore:
+    """Ring buffers for every loaded (symbol, timeframe), kept current by the save functions"""
+
+    def __init__(self, capacity: int = LIVE_STORE_CAPACITY):
+        self.capacity = capacity
+        self._buffers: dict[tuple[str, str], RingBuffer] = {}
+        self._lock = threading.Lock()
+        # Bumped on every write to a key, and for all keys (_epoch) on clear; a load
+        # that raced with either is discarded instead of installing stale rows
+        self._generations: dict[tuple[str, str], int] = {}
+        self._epoch = 0
+
+    def _stamp(self, key: tuple[str, str]) -> tuple[int, int]:
+        return self._epoch, self._generations.get(key, 0)
+
+    def _touch(self, key: tuple[str, str]):
+        self._generations[key] = self._generations.get(key, 0) + 1
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def load(self, timeframe: str, symbols: list[str]):
+        """(Re)load buffers for symbols from market_data_* and technical_analysis."""
+        if not self.enabled or not symbols:
+            return
+
+        with self._lock:
+            stamps = {symbol: self._stamp((symbol, timeframe)) for symbol in symbols}
+
+        columns = db.get_live_window(timeframe, symbols, self.capacity)
+        names, starts = np.unique(columns["symbol"], return_index=True)
+        bounds = dict(zip(names, zip(starts, list(starts[1:]) + [len(columns["time"])])))
+
+        skipped = 0
+        with self._lock:
+            for symbol in symbols:
+                key = (symbol, timeframe)
+                self._buffers.pop(key, None)
+                if self._stamp(key) != stamps[symbol]:
+                    skipped += 1  # written or cleared while we were reading
+                    continue
+                if symbol not in bounds:
+                    continue
+
+                start, end = bounds[symbol]
+                rows = np.zeros(end - start, dtype=BAR_DTYPE)
+                for field in BAR_DTYPE.names:
+                    rows[field] = columns[field][start:end]
+
+                buffer = RingBuffer(self.capacity)
+                buffer.extend(rows)
+                buffer.complete = int(columns["total"][start]) <= self.capacity
+                buffer.version = int(columns["version"][start])
+                self._buffers[key] = buffer
+
+        if skipped:
+            logger.info(f"Live store skipped {skipped} {timeframe} buffers changed during load")
+
+    def load_all(self):
+        """Populate the store for the whole universe and every timeframe."""
+        if not self.enabled:
+            return
+
+        symbols = db.get_symbols()
+        for timeframe in TABLE_MAP:
+            self.load(timeframe, symbols)
+        logger.info(f"Live store loaded: {self.stats()}")
+
+    def get(self, symbol: str, timeframe: str, limit: Optional[int] = None):
+        """
+        Get the latest `limit` bars (all if None) and the data version.
+
+        Loads the key on first access. Returns None when the store cannot answer,
+        e.g. the window is larger than what is buffered. On readers, a newer
+        snapshot (checked at most every SNAPSHOT_CHECK_INTERVAL) clears the store
+        first, since hot keys would otherwise never reach the database.
+        """
+        if not self.enabled:
+            return None
+
+        db.check_snapshot()
+        key = (symbol, timeframe)
+        if key not in self._buffers:
+            self.load(timeframe, [symbol])
+
+        with self._lock:
+            buffer = self._buffers.get(key)
+            if buffer is None or not buffer.fits(limit):
+                return None
+            return buffer.latest(limit), buffer.version
+
+    def on_bars(self, timeframe: str, data: list[dict], version: int):
+        """Apply bars just written by the save functions to loaded buffers."""
+        if not self.enabled or not data:
+            return
+
+        groups: dict[str, list[dict]] = {}
+        for row in data:
+            groups.setdefault(row["symbol"], []).append(row)
+
+        stale = []
+        with self._lock:
+            for symbol, rows in groups.items():
+                self._touch((symbol, timeframe))
+                buffer = self._buffers.get((symbol, timeframe))
+                if buffer is None:
+                    continue
+                if buffer.upsert_bars(bars_to_array(rows)):
+                    buffer.version = version
+                else:
+                    stale.append(symbol)
+                    del self._buffers[(symbol, timeframe)]
+
+        if stale:
+            logger.info(f"Live store dropped {len(stale)} {timeframe} buffers for reload")
+
+    def on_indicators(self, data: list[dict], version: int):
+        """Apply technical analysis rows just written by the save functions."""
+        if not self.enabled or not data:
+            return
+
+        groups: dict[tuple[str, str], list[dict]] = {}
+        for row in data:
+            groups.setdefault((row["symbol"], row["timeframe"]), []).append(row)
+
+        with self._lock:
+            for key, rows in groups.items():
+                self._touch(key)
+                buffer = self._buffers.get(key)
+                if buffer is not None:
+                    buffer.upsert_indicators(indicators_to_array(rows))
+                    buffer.version = version
+
+    def clear(self):
+        with self._lock:
+            self._buffers.clear()
+            self._epoch += 1
+
+    def stats(self) -> dict:
+        """Buffer count and memory use"""
+        return {
+            "capacity": self.capacity,
+            "buffers": len(self._buffers),
+            "bytes_per_bar": BAR_DTYPE.itemsize,
+            "bytes": BAR_DTYPE.itemsize * self.capacity * len(self._buffers),
+        }
+
+
+store = LiveStore()
@@ -0,0 +1,211 @@
+"""
+Client-side request scheduling for market data providers.
+
+Combines a token bucket matched to the provider's quota, retries with
+exponential backoff and jitter, and AIMD-style adaptive concurrency.
+"""
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying: rate limited or transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(headers: httpx.Headers) -> Optional[float]:
+    """
+    Work out how long the provider wants us to wait, in seconds.
+
+    Understands `Retry-After` (delta seconds or HTTP date) and the
+    `X-RateLimit-Remaining` / `X-RateLimit-Reset` pair (reset as epoch seconds).
+    Returns None if the headers carry no hint.
+    """
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                when = parsedate_to_datetime(retry_after)
+                return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+            except (TypeError, ValueError):
+                pass
+
+    remaining = headers.get("x-ratelimit-remaining")
+    reset = headers.get("x-ratelimit-reset")
+    if remaining is not None and reset is not None:
+        try:
+            if int(remaining) <= 0:
+                return max(0.0, float(reset) - time.time())
+        except ValueError:
+            pass
+
+    return None
+
+
+class TokenBucket:
+    """Token bucket refilled at `rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def block_for(self, seconds: float) -> None:
+        """Stop handing out tokens for `seconds` (e.g. after a Retry-After)."""
+        now = time.monotonic()
+        self._blocked_until = max(self._blocked_until, now + seconds)
+        self._tokens = 0.0
+        self._updated = max(self._updated, now)
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class AdaptiveConcurrency:
+    """
+    Concurrency limiter that adapts to the observed error rate.
+
+    Additive increase after a window of clean responses, multiplicative
+    decrease on every throttled or failed request.
+    """
+
+    def __init__(self, initial: int = 2, maximum: int = 8, minimum: int = 1):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = max(minimum, min(initial, maximum))
+        self._in_flight = 0
+        self._successes = 0
+        self._cond = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        async with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self) -> None:
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.maximum:
+            self.limit += 1
+            self._successes = 0
+            logger.debug(f"Concurrency raised to {self.limit}")
+
+    def on_error(self) -> None:
+        self._successes = 0
+        new_limit = max(self.minimum, self.limit // 2)
+        if new_limit != self.limit:
+            logger.info(f"Concurrency lowered to {new_limit}")
+        self.limit = new_limit
+
+
+class RequestScheduler:
+    """
+    Rate-limited, retrying request executor shared by a DataClient.
+
+    Every request waits for a token and a concurrency slot. 429s and transient
+    5xx/transport errors are retried with exponential backoff and full jitter,
+    honouring any wait time the provider advertises.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 200,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 30.0,
+        max_concurrency: int = 4,
+    ):
+        rate = requests_per_minute / 60.0
+        self.bucket = TokenBucket(rate=rate, capacity=max(1.0, rate))
+        self.concurrency = AdaptiveConcurrency(initial=1, maximum=max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given attempt (0-based)."""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2**attempt))
+
+    async def request(
+        self, client: httpx.AsyncClient, method: str, url: str, **kwargs
+    ) -> httpx.Response:
+        """
+        Send a request through the bucket, retrying throttled and transient failures.
+
+        Raises httpx.HTTPStatusError / httpx.TransportError once retries are exhausted.
+        """
+        attempt = 0
+        while True:
+            async with self.concurrency:
+                await self.bucket.acquire()
+                try:
+                    response = await client.request(method, url, **kwargs)
+                except httpx.TransportError as e:
+                    response = None
+                    error: Exception = e
+
+            if response is not None and response.status_code not in RETRY_STATUSES:
+                # Other 4xx are the caller's fault, not a signal about provider capacity
+                if not response.is_error:
+                    self.concurrency.on_success()
+                response.raise_for_status()
+                return response
+
+            self.concurrency.on_error()
+
+            delay = None
+            if response is not None:
+                delay = parse_retry_after(response.headers)
+                if delay is not None:
+                    self.bucket.block_for(delay)
+                reason = f"HTTP {response.status_code}"
+            else:
+                reason = f"{type(error).__name__}: {error}"
+
+            if attempt >= self.max_retries:
+                logger.error(f"Giving up on {url} after {attempt + 1} attempts ({reason})")
+                if response is not None:
+                    response.raise_for_status()
+                raise error
+
+            if delay is None:
+                delay = self.backoff(attempt)
+            attempt += 1
+            logger.warning(
+                f"{reason} from {url}, retry {attempt}/{self.max_retries} in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
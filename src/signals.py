@@ -0,0 +1,112 @@
+"""
+Vectorized signal generation from indicator arrays.
+
+Signals are crossover events encoded as int8 arrays: +1 for an upward cross,
+-1 for a downward cross, 0 otherwise.
+"""
+from typing import Optional
+
+import numpy as np
+
+SIGNAL_NAMES = ("ema9_cross", "macd_cross", "histogram_cross", "vwap_reclaim")
+
+
+def crosses(a: np.ndarray, b: np.ndarray | float) -> np.ndarray:
+    """
+    Detect where `a` crosses `b`.
+
+    Returns an int8 array the length of `a`: +1 where a ends up above b after last
+    being below it, -1 for the reverse. Bars where a touches b carry the previous
+    side forward, so a touch-and-bounce is not a cross. The first element and any
+    bar touching a NaN are 0, and a NaN forgets the previous side.
+    """
+    side = np.sign(a - b)
+    if len(side) < 2:
+        return np.zeros(len(side), dtype=np.int8)
+
+    # Forward-fill touches (0) from the last bar that was above, below or NaN
+    idx = np.where(side != 0, np.arange(len(side)), 0)
+    np.maximum.accumulate(idx, out=idx)
+    side = side[idx]
+
+    prev, curr = side[:-1], side[1:]
+    out = np.zeros(len(side), dtype=np.int8)
+    with np.errstate(invalid="ignore"):
+        out[1:][(prev < 0) & (curr > 0)] = 1
+        out[1:][(prev > 0) & (curr < 0)] = -1
+    return out
+
+
+def _lookback(diffs: list[np.ndarray], start: int) -> int:
+    """Bars before `start` needed to know which side of `b` every series was on."""
+    if start == 0:
+        return 0
+
+    settled = np.ones(start, dtype=bool)
+    for diff in diffs:
+        settled &= diff[:start] != 0  # NaN counts as settled: it resets the side
+    idx = np.flatnonzero(settled)
+    return start - idx[-1] if len(idx) else start
+
+
+def compute_signals(
+    close: np.ndarray,
+    vwap: np.ndarray,
+    ema9: np.ndarray,
+    macd: np.ndarray,
+    macd_signal: np.ndarray,
+    histogram: np.ndarray,
+    start: int = 0,
+) -> dict[str, np.ndarray]:
+    """
+    Evaluate all signals over a series in one pass.
+
+    Args:
+        close, vwap, ema9, macd, macd_signal, histogram: Aligned float arrays
+            (NaN where an indicator is still warming up)
+        start: First bar to evaluate; earlier bars are only used as lookback
+            (back to the last bar where no series touched its reference), so
+            incremental runs only pay for the newest bars
+
+    Returns:
+        Dict of signal name -> int8 array covering bars [start, len(close))
+    """
+    diffs = {
+        "ema9_cross": close - ema9,
+        "macd_cross": macd - macd_signal,
+        "histogram_cross": histogram,
+        "vwap_reclaim": close - vwap,
+    }
+    lookback = _lookback(list(diffs.values()), start)
+    s = slice(start - lookback, None)
+
+    result = {name: crosses(diff[s], 0.0) for name, diff in diffs.items()}
+    return {name: values[lookback:] for name, values in result.items()}
+
+
+def to_bar_signals(signals: dict[str, np.ndarray]) -> list[Optional[dict]]:
+    """
+    Convert signal arrays into per-bar dicts for technical_analysis.signals.
+
+    Bars with no events get None; others map signal name -> direction.
+    """
+    names = list(signals)
+    if not names:
+        return []
+
+    stacked = np.stack([signals[name] for name in names])
+    result: list[Optional[dict]] = [None] * stacked.shape[1]
+
+    for i in np.flatnonzero(stacked.any(axis=0)):
+        result[i] = {names[k]: int(stacked[k, i]) for k in np.flatnonzero(stacked[:, i])}
+    return result
+
+
+def to_events(signals: dict[str, np.ndarray]) -> list[tuple[int, str, int]]:
+    """Flatten signal arrays into (bar index, signal name, direction) events."""
+    events = []
+    for name, values in signals.items():
+        for i in np.flatnonzero(values):
+            events.append((int(i), name, int(values[i])))
+    events.sort()
+    return events
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src import db
+
+T0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def tmp_db(tmp_path, monkeypatch):
+    """A fresh writer database for one test"""
+    monkeypatch.setattr(db, "DB_PATH", str(tmp_path / "test.duckdb"))
+    monkeypatch.setattr(db, "_conn", None)
+    db.init_db()
+    yield db
+    db._conn.close()
+
+
+def make_bars(symbol: str = "SPY", start: int = 0, n: int = 1) -> list[dict]:
+    """5-minute bars `start` to `start + n` from T0, rising by 1 with volume 100 * (i + 1)"""
+    return [
+        {
+            "symbol": symbol,
+            "timestamp": T0 + timedelta(minutes=5 * i),
+            "open": 100.0 + i,
+            "high": 101.0 + i,
+            "low": 99.0 + i,
+            "close": 100.0 + i,
+            "volume": 100 * (i + 1),
+            "trade_count": 1,
+            "vwap": 100.0 + i,
+        }
+        for i in range(start, start + n)
+    ]
+
+
+def make_ta(bars: list[dict], timeframe: str = "5T") -> list[dict]:
+    """Indicator rows for bars: EMA9 just below the close and a positive MACD histogram"""
+    return [
+        {
+            "symbol": bar["symbol"],
+            "timeframe": timeframe,
+            "timestamp": bar["timestamp"],
+            "indicators": {
+                "EMA9": bar["close"] - 1,
+                "MACD": {"macd": 1.0, "signal": 0.5, "histogram": 0.5},
+            },
+        }
+        for bar in bars
+    ]
@@ -0,0 +1,112 @@
+import os
+import signal
+
+import numpy as np
+import pytest
+
+from src import backtest
+from src.signals import crosses
+
+
+def make_arrays(n: int = 300, seed: int = 0) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.normal(0, 1, n).cumsum()
+    ema9 = close + rng.normal(0, 0.5, n)
+    ema9[:8] = np.nan
+    return {
+        "time": np.arange(n, dtype=np.int64) * 300,
+        "open": close + rng.normal(0, 0.2, n),
+        "close": close,
+        "ema9": ema9,
+        "macd": rng.normal(0, 1, n),
+        "macd_signal": rng.normal(0, 1, n),
+    }
+
+
+def simulate_loop(arrays: dict[str, np.ndarray], params: dict) -> float:
+    """Bar-by-bar reference implementation of the strategy's total return"""
+    open_, close, ema9 = arrays["open"], arrays["close"], arrays["ema9"]
+    macd_cross = crosses(arrays["macd"], arrays["macd_signal"])
+    n = len(close)
+
+    equity, held, target = 1.0, 0.0, 0.0
+    for i in range(n):
+        change = target - held
+        held = target
+        bar_return = (open_[i + 1] if i + 1 < n else close[i]) / open_[i] - 1
+        equity *= 1 + held * bar_return - abs(change) * params["fee_bps"] / 10_000
+
+        exit_ = bool(close[i] < ema9[i] * (1 - params["stop_buffer"]))
+        if params["exit_on_macd_cross"] and macd_cross[i] < 0:
+            exit_ = True
+        if macd_cross[i] > 0 and not exit_:
+            target = 1.0
+        elif exit_:
+            target = 0.0
+
+    return equity - 1
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        backtest.DEFAULT_PARAMS,
+        {"stop_buffer": 0.01, "exit_on_macd_cross": True, "fee_bps": 5.0},
+    ],
+)
+def test_simulate_matches_loop(params):
+    arrays = make_arrays()
+    result = backtest.simulate(arrays, params)
+    assert result["total_return"] == pytest.approx(simulate_loop(arrays, params))
+    assert result["trades"] > 0
+
+
+def test_trade_returns_include_exit_fee():
+    # One trade: enter after bar 1's MACD cross, gain 1.6%, exit below EMA9 on bar 3
+    price = np.array([100.0, 100.0, 100.0, 101.6, 101.6])
+    arrays = {
+        "time": np.arange(5, dtype=np.int64) * 300,
+        "open": price,
+        "close": price,
+        "ema9": price + np.array([-1.0, -1.0, -1.0, 1.0, -1.0]),
+        "macd": np.array([-1.0, 1.0, 1.0, 1.0, 1.0]),
+        "macd_signal": np.zeros(5),
+    }
+    result = backtest.simulate(arrays, {**backtest.DEFAULT_PARAMS, "fee_bps": 100.0})
+    assert result["trades"] == 1
+    assert result["total_return"] < 0
+    assert result["win_rate"] == 0.0
+
+
+def test_expand_grid_coerces_and_validates():
+    grid = backtest.expand_grid({"stop_buffer": [0, "0.01"], "fee_bps": [2]})
+    assert [p["stop_buffer"] for p in grid] == [0.0, 0.01]
+    assert all(p["fee_bps"] == 2.0 and p["exit_on_macd_cross"] is False for p in grid)
+
+    for bad in (
+        {"fee_bps": ["x"]},
+        {"fee_bps": [-1]},
+        {"stop_buffer": [None]},
+        {"stop_buffer": [True]},
+        {"exit_on_macd_cross": ["yes"]},
+        {"unknown": [1]},
+    ):
+        with pytest.raises(ValueError):
+            backtest.expand_grid(bad)
+
+
+def test_broken_pool_is_replaced(monkeypatch, caplog):
+    monkeypatch.setattr(backtest, "BACKTEST_WORKERS", 1)
+    series = {"SPY": make_arrays(100)}
+    grid = {"fee_bps": list(range(backtest.MIN_PARALLEL_RUNS))}
+
+    try:
+        expected = backtest.run_backtest(series, grid)
+        for process in list(backtest.get_pool()._processes.values()):
+            os.kill(process.pid, signal.SIGKILL)
+            process.join()
+
+        assert backtest.run_backtest(series, grid) == expected
+        assert "pool broken" in caplog.text
+    finally:
+        backtest.shutdown_pool()
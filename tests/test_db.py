@@ -0,0 +1,38 @@
+import threading
+
+from conftest import make_bars
+
+
+def test_threads_get_their_own_connection(tmp_db):
+    assert tmp_db.get_conn() is tmp_db.get_conn()
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(tmp_db.get_conn()))
+    thread.start()
+    thread.join()
+    assert other[0] is not tmp_db.get_conn()
+
+
+def test_concurrent_reads_do_not_cross(tmp_db):
+    sizes = {"SPY": 120, "AAPL": 80}
+    for symbol, n in sizes.items():
+        tmp_db.save_market_data(make_bars(symbol, 0, n), "5T")
+
+    failures = []
+
+    def read(symbol: str):
+        for _ in range(50):
+            try:
+                bars = tmp_db.get_market_data(symbol, "5T")
+                if len(bars) != sizes[symbol] or bars[0]["symbol"] != symbol:
+                    failures.append((symbol, len(bars)))
+            except Exception as e:
+                failures.append((symbol, repr(e)))
+
+    threads = [threading.Thread(target=read, args=(s,)) for s in ("SPY", "AAPL") * 2]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert failures == []
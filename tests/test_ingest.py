@@ -0,0 +1,168 @@
+import asyncio
+from functools import partial
+
+import httpx
+import pytest
+
+from src import ingest
+from src.data_client import DataClient, shard_symbols
+from src.rate_limiter import RequestScheduler
+
+START, END = "2024-01-01", "2024-01-02"
+
+
+class MockProvider:
+    """Two pages of one bar per symbol; requests listed in `fail` return 401"""
+
+    def __init__(self):
+        self.calls: list[tuple[str, str | None]] = []
+        self.fail: set[tuple[str, str | None]] = set()
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        symbols = request.url.params["symbols"]
+        token = request.url.params.get("page_token")
+        self.calls.append((symbols, token))
+        if (symbols, token) in self.fail:
+            return httpx.Response(401)
+
+        minute = 0 if token is None else 5
+        bars = {
+            s: [{"t": f"2024-01-01T09:{30 + minute}:00Z", "o": 1, "h": 1, "l": 1, "c": 1, "v": 1}]
+            for s in symbols.split(",")
+        }
+        return httpx.Response(
+            200, json={"bars": bars, "next_page_token": "p2" if token is None else None}
+        )
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    """A mock provider with one symbol per shard"""
+    monkeypatch.setattr(ingest, "shard_symbols", partial(shard_symbols, max_symbols=1))
+    return MockProvider()
+
+
+def make_client(provider: MockProvider) -> DataClient:
+    client = DataClient("https://provider.test", transport=httpx.MockTransport(provider))
+    client.scheduler = RequestScheduler(requests_per_minute=60_000, max_retries=0)
+    return client
+
+
+def run(client: DataClient, timeframe: str = "5T", refresh: bool = False) -> dict:
+    ingest.start_job(START, END, refresh)
+    return asyncio.run(ingest.ingest_range(client, START, END, timeframe, ["AAA", "BBB"]))
+
+
+def test_shard_symbols_respects_caps_and_balances():
+    symbols = [f"S{i:03d}" for i in range(250)]
+    shards = shard_symbols(symbols, max_symbols=100, max_chars=1500)
+
+    assert [s for shard in shards for s in shard] == symbols
+    assert [len(shard) for shard in shards] == [84, 84, 82]
+
+
+def test_shard_symbols_splits_on_query_length():
+    symbols = ["ABCDEFGHI"] * 30  # 10 chars per symbol with the comma
+    shards = shard_symbols(symbols, max_symbols=100, max_chars=100)
+
+    assert all(len(",".join(shard)) <= 100 for shard in shards)
+    assert sum(len(shard) for shard in shards) == 30
+
+
+def test_shard_symbols_empty():
+    assert shard_symbols([]) == []
+
+
+def test_empty_universe_ingests_nothing(tmp_db):
+    client = DataClient("https://provider.test")
+    result = asyncio.run(ingest.ingest_range(client, "2024-01-01", "2024-01-02", "5T", []))
+    assert result == {"count": 0, "pages": 0, "shards": 0, "resumed": False}
+
+
+def test_rerun_resumes_only_unfinished_shards(tmp_db, provider):
+    client = make_client(provider)
+    provider.fail = {("BBB", "p2")}
+    with pytest.raises(httpx.HTTPStatusError):
+        run(client)
+
+    provider.fail, provider.calls = set(), []
+    result = run(client)
+
+    assert provider.calls == [("BBB", "p2")]
+    assert result == {"count": 4, "pages": 4, "shards": 2, "resumed": True}
+    assert len(tmp_db.get_market_data("AAA", "5T")) == 2
+    assert len(tmp_db.get_market_data("BBB", "5T")) == 2
+
+
+def test_rerun_skips_finished_timeframes(tmp_db, provider):
+    client = make_client(provider)
+    run(client, "5T")
+    provider.fail = {("AAA", "p2")}
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(ingest.ingest_range(client, START, END, "15T", ["AAA", "BBB"]))
+
+    provider.fail, provider.calls = set(), []
+    assert run(client, "5T")["count"] == 4
+    assert provider.calls == []
+    assert run(client, "15T")["count"] == 4
+    assert provider.calls == [("AAA", "p2")]
+
+
+def test_complete_or_refreshed_jobs_start_over(tmp_db, provider):
+    client = make_client(provider)
+    run(client)
+
+    provider.calls = []
+    assert run(client)["resumed"] is False
+    assert len(provider.calls) == 4
+
+    provider.fail = {("BBB", "p2")}
+    with pytest.raises(httpx.HTTPStatusError):
+        run(client)
+
+    provider.fail, provider.calls = set(), []
+    run(client, refresh=True)
+    assert len(provider.calls) == 4
+
+
+def test_page_and_checkpoint_roll_back_together(tmp_db, provider, monkeypatch):
+    client = make_client(provider)
+    bump_versions = tmp_db._bump_versions
+
+    def fail_on_second_page(conn, keys, version):
+        if len(tmp_db.get_market_data("AAA", "5T")) == 1:
+            raise RuntimeError("disk full")
+        bump_versions(conn, keys, version)
+
+    monkeypatch.setattr(tmp_db, "_bump_versions", fail_on_second_page)
+    ingest.start_job(START, END)
+    with pytest.raises(RuntimeError):
+        asyncio.run(ingest.ingest_range(client, START, END, "5T", ["AAA"]))
+
+    job_id = ingest.make_job_id(START, END)
+    checkpoint = tmp_db.get_checkpoint(job_id, "5T", "AAA")
+    assert (checkpoint["pages"], checkpoint["page_token"]) == (1, "p2")
+    assert len(tmp_db.get_market_data("AAA", "5T")) == 1
+
+
+def test_interrupted_job_keeps_its_shard_plan(tmp_db):
+    job_id = ingest.make_job_id("2024-01-01", "2024-01-02")
+    for symbols, status in (("AAPL,MSFT", ingest.STATUS_RUNNING), ("SPY", ingest.STATUS_DONE)):
+        tmp_db.save_page_with_checkpoint(
+            [],
+            "5T",
+            {
+                "job_id": job_id,
+                "symbols": symbols,
+                "page_token": "p2",
+                "pages": 1,
+                "row_count": 0,
+                "status": status,
+            },
+        )
+
+    shards = ingest.plan_shards(job_id, "5T", ["AAPL", "MSFT", "NVDA", "SPY"])
+    assert shards == [["AAPL", "MSFT"], ["SPY"], ["NVDA"]]
+
+    # A timeframe without checkpoints is planned from the current universe
+    assert ingest.plan_shards("other", "5T", ["AAPL", "NVDA"]) == [["AAPL", "NVDA"]]
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from conftest import make_bars
+from fastapi.testclient import TestClient
+
+from src import db
+from src.api.server import app
+from src.live_store import BAR_DTYPE, LiveStore, RingBuffer
+
+
+def make_rows(times, close=1.0) -> np.ndarray:
+    rows = np.zeros(len(times), dtype=BAR_DTYPE)
+    rows["time"] = times
+    rows["close"] = close
+    return rows
+
+
+def test_upsert_bars_appends_and_evicts():
+    buffer = RingBuffer(4)
+    assert buffer.upsert_bars(make_rows([1, 2, 3]))
+    assert buffer.complete
+
+    assert buffer.upsert_bars(make_rows([4, 5, 6]))
+    assert buffer.times().tolist() == [3, 4, 5, 6]
+    assert not buffer.complete
+    assert buffer.latest(2)["time"].tolist() == [5, 6]
+
+
+def test_upsert_bars_updates_in_place():
+    buffer = RingBuffer(4)
+    buffer.upsert_bars(make_rows([1, 2, 3, 4, 5]))
+
+    assert buffer.upsert_bars(make_rows([4, 6], close=9.0))
+    assert buffer.times().tolist() == [3, 4, 5, 6]
+    assert buffer.latest()["close"].tolist() == [1.0, 9.0, 1.0, 9.0]
+    # Older than the window of a partial buffer: nothing buffered to update
+    assert buffer.upsert_bars(make_rows([1], close=7.0))
+
+
+def test_upsert_bars_rejects_gaps_and_history():
+    buffer = RingBuffer(4)
+    buffer.upsert_bars(make_rows([10, 20, 30]))
+    assert not buffer.upsert_bars(make_rows([15]))  # gap fill inside the window
+    assert not buffer.upsert_bars(make_rows([5]))  # history for a complete buffer
+
+
+def test_load_discards_rows_written_during_the_query(tmp_db, monkeypatch):
+    tmp_db.save_market_data(make_bars("SPY", 0, 10), "5T")
+    store = LiveStore(capacity=50)
+    read_window = db.get_live_window
+
+    def racing_read(timeframe, symbols, limit):
+        columns = read_window(timeframe, symbols, limit)
+        # A write lands after the read and before the buffer is installed
+        store.on_bars("5T", make_bars("SPY", 10, 1), db._next_version())
+        return columns
+
+    monkeypatch.setattr(db, "get_live_window", racing_read)
+    store.load("5T", ["SPY"])
+    assert store.stats()["buffers"] == 0
+
+    monkeypatch.setattr(db, "get_live_window", read_window)
+    rows, _ = store.get("SPY", "5T")
+    assert len(rows) == 10
+
+
+def test_get_checks_for_a_newer_snapshot(tmp_db, monkeypatch):
+    tmp_db.save_market_data(make_bars("SPY", 0, 10), "5T")
+    store = LiveStore(capacity=50)
+    assert store.get("SPY", "5T", 5) is not None
+
+    monkeypatch.setattr(db, "check_snapshot", store.clear)
+    tmp_db.save_market_data(make_bars("SPY", 10, 1), "5T")  # not seen by this store
+    rows, version = store.get("SPY", "5T", 5)
+    assert rows["time"][-1] == int(make_bars("SPY", 10, 1)[0]["timestamp"].timestamp())
+    assert version == tmp_db.get_data_version("SPY", "5T")
+
+
+@pytest.mark.parametrize("limit", [0, -3])
+def test_data_limit_must_be_positive(limit):
+    response = TestClient(app).get(f"/data/SPY/5T?limit={limit}")
+    assert response.status_code == 422
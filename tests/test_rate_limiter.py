@@ -0,0 +1,93 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.data_client import DataClient
+from src.rate_limiter import RequestScheduler, parse_retry_after
+
+
+def make_client(handler, max_retries: int = 3) -> DataClient:
+    client = DataClient("https://provider.test", transport=httpx.MockTransport(handler))
+    client.scheduler = RequestScheduler(
+        requests_per_minute=60_000, max_retries=max_retries, backoff_base=0.001, max_concurrency=4
+    )
+    return client
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(httpx.Headers({"Retry-After": "2"})) == 2.0
+    assert parse_retry_after(httpx.Headers({"Retry-After": "-1"})) == 0.0
+    assert parse_retry_after(httpx.Headers({"X-RateLimit-Remaining": "5"})) is None
+    assert parse_retry_after(httpx.Headers()) is None
+
+
+def test_429_retries_the_same_page():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        token = request.url.params.get("page_token")
+        seen.append(token)
+        if token is None:
+            return httpx.Response(200, json={"bars": {"SPY": [{"t": 1}]}, "next_page_token": "p2"})
+        if seen.count("p2") <= 2:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, json={"bars": {"SPY": [{"t": 2}]}, "next_page_token": None})
+
+    client = make_client(handler)
+    bars = asyncio.run(client.get_all_bars("2024-01-01", "2024-01-02", "5Min"))
+
+    assert seen == [None, "p2", "p2", "p2"]
+    assert bars == {"SPY": [{"t": 1}, {"t": 2}]}
+
+
+def test_503_gives_up_after_max_retries():
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(503)
+
+    client = make_client(handler, max_retries=2)
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(client.get_bars("2024-01-01", "2024-01-02", "5Min", symbols=["SPY"]))
+
+    assert calls == 3
+    assert client.scheduler.concurrency.limit == 1
+
+
+def test_client_errors_are_not_retried_or_counted_as_success():
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(401)
+
+    client = make_client(handler)
+
+    async def run():
+        for _ in range(3):
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.get_bars("2024-01-01", "2024-01-02", "5Min", symbols=["SPY"])
+
+    asyncio.run(run())
+
+    assert calls == 3
+    assert client.scheduler.concurrency.limit == 1
+
+
+def test_concurrency_grows_on_success():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"bars": {}, "next_page_token": None})
+
+    client = make_client(handler)
+
+    async def run():
+        for _ in range(3):
+            await client.get_bars("2024-01-01", "2024-01-02", "5Min", symbols=["SPY"])
+
+    asyncio.run(run())
+
+    assert client.scheduler.concurrency.limit > 1
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from conftest import make_bars, make_ta
+
+from src.config import VOLUME_AVG_PERIOD
+from src.signals import crosses, to_bar_signals
+
+
+def test_latest_values_use_newest_bar_with_indicators(tmp_db):
+    bars = make_bars("SPY", 0, 80)
+    tmp_db.save_market_data(bars, "5T")
+    # Indicators lag the bars by far more than the volume window
+    tmp_db.save_technical_analysis(make_ta(bars[:40]))
+
+    rows = tmp_db.screen_latest_values("5T", {"close_vs_ema9": "above"})
+    assert [r["symbol"] for r in rows] == ["SPY"]
+
+    row = rows[0]
+    assert row["timestamp"] == bars[39]["timestamp"]
+    assert row["volume"] == bars[39]["volume"]
+    # The average covers the preceding bars only, not the bar itself
+    preceding = [b["volume"] for b in bars[39 - VOLUME_AVG_PERIOD:39]]
+    assert row["volume_avg"] == pytest.approx(sum(preceding) / len(preceding))
+
+
+def test_min_volume_ratio_compares_against_preceding_bars(tmp_db):
+    bars = make_bars("SPY", 0, 30)
+    bars[-1]["volume"] = 10 * bars[-2]["volume"]
+    tmp_db.save_market_data(bars, "5T")
+    tmp_db.save_technical_analysis(make_ta(bars))
+
+    assert len(tmp_db.screen_latest_values("5T", {}, min_volume_ratio=5)) == 1
+    assert tmp_db.screen_latest_values("5T", {}, min_volume_ratio=20) == []
+
+
+@pytest.mark.parametrize(("macd", "expected"), [([1.0, 0.5, 1.0], []), ([0.0, 0.5, 1.0], ["SPY"])])
+def test_cross_filters_use_stored_signals(tmp_db, macd, expected):
+    bars = make_bars("SPY", 0, 3)
+    macd_signal = np.full(3, 0.5)
+    flags = to_bar_signals({"macd_cross": crosses(np.array(macd), macd_signal)})
+
+    rows = make_ta(bars)
+    for row, value, signals in zip(rows, macd, flags):
+        row["indicators"]["MACD"] = {"macd": value, "signal": 0.5, "histogram": value - 0.5}
+        row["signals"] = signals
+    tmp_db.save_market_data(bars, "5T")
+    tmp_db.save_technical_analysis(rows)
+
+    matches = tmp_db.screen_latest_values("5T", {"macd_cross": "up"})
+    assert [r["symbol"] for r in matches] == expected
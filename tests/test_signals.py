@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.server import app
+from src.signals import compute_signals, crosses, to_bar_signals, to_events
+
+
+@pytest.mark.parametrize(
+    ("a", "expected"),
+    [
+        ([-1, 1, -1], [0, 1, -1]),
+        ([1, 0, 1], [0, 0, 0]),  # touch and bounce
+        ([-1, 0, 0, 1], [0, 0, 0, 1]),  # cross completes when a ends up above
+        ([1, 0, -1], [0, 0, -1]),
+        ([0, 0, 1], [0, 0, 0]),  # no known previous side
+        ([-1, np.nan, 1], [0, 0, 0]),  # NaN forgets the side
+        ([np.nan, -1, 1], [0, 0, 1]),
+    ],
+)
+def test_crosses(a, expected):
+    assert crosses(np.array(a, dtype=np.float64), 0.0).tolist() == expected
+
+
+def test_crosses_short_input():
+    assert crosses(np.array([1.0]), 0.0).tolist() == [0]
+    assert crosses(np.array([]), 0.0).tolist() == []
+
+
+def test_incremental_signals_match_full_run():
+    rng = np.random.default_rng(0)
+    n = 400
+    # Rounded series touch each other often
+    close = np.round(rng.normal(0, 1, n).cumsum())
+    ema9 = np.round(close + rng.integers(-1, 2, n))
+    vwap = np.round(close + rng.integers(-1, 2, n))
+    macd = np.round(rng.normal(0, 1, n))
+    macd_signal = np.round(rng.normal(0, 1, n))
+    histogram = macd - macd_signal
+    ema9[:8] = np.nan
+    arrays = (close, vwap, ema9, macd, macd_signal, histogram)
+
+    full = compute_signals(*arrays)
+    for start in (1, 10, 137, 399):
+        tail = compute_signals(*arrays, start=start)
+        for name, values in tail.items():
+            assert values.tolist() == full[name][start:].tolist(), (name, start)
+
+
+def test_bar_signals_and_events():
+    signals = {
+        "macd_cross": np.array([0, 1, 0], dtype=np.int8),
+        "ema9_cross": np.array([0, -1, 1], dtype=np.int8),
+    }
+    assert to_bar_signals(signals) == [None, {"macd_cross": 1, "ema9_cross": -1}, {"ema9_cross": 1}]
+    assert to_events(signals) == [(1, "ema9_cross", -1), (1, "macd_cross", 1), (2, "ema9_cross", 1)]
+
+
+@pytest.mark.parametrize("limit", [0, -3])
+def test_signals_limit_must_be_positive(limit):
+    response = TestClient(app).get(f"/signals/SPY/5T?limit={limit}")
+    assert response.status_code == 422
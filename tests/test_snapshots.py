@@ -0,0 +1,50 @@
+import pytest
+from conftest import make_bars
+
+
+@pytest.fixture
+def snapshots(tmp_db, tmp_path, monkeypatch):
+    """Switch the db module between the writer connection and a snapshot reader"""
+    monkeypatch.setattr(tmp_db, "SNAPSHOT_PATH", str(tmp_path / "test.snapshot.duckdb"))
+    monkeypatch.setattr(tmp_db, "SNAPSHOT_CHECK_INTERVAL", 0)
+    monkeypatch.setattr(tmp_db, "LIVE_STORE_CAPACITY", 0)
+    for name in ("_snapshot_name", "_snapshot_mtime"):
+        monkeypatch.setattr(tmp_db, name, None)
+    writer = tmp_db.get_conn()
+
+    def as_role(role: str):
+        monkeypatch.setattr(tmp_db, "ROLE", role)
+        monkeypatch.setattr(tmp_db, "_conn", writer if role == "writer" else reader[0])
+
+    def read_bars() -> int:
+        as_role("reader")
+        count = len(tmp_db.get_market_data("SPY", "5T"))
+        reader[0] = tmp_db._conn
+        as_role("writer")
+        return count
+
+    reader = [None]
+    as_role("writer")
+    yield tmp_db, read_bars
+    as_role("writer")
+
+
+def test_reader_follows_new_snapshots(snapshots, tmp_path):
+    db, read_bars = snapshots
+
+    for i in range(4):
+        db.save_market_data(make_bars("SPY", i), "5T")
+        db.publish_snapshot()
+        assert read_bars() == i + 1
+
+    info = db.get_snapshot_info()
+    assert info["serving"] is not None
+    assert info["serving_published_at"] == info["published_at"]
+    # Only the current and previous snapshots are kept
+    assert len(list(tmp_path.glob("test.snapshot.*.duckdb"))) == 2
+
+
+def test_reader_without_snapshot_raises(snapshots):
+    db, read_bars = snapshots
+    with pytest.raises(RuntimeError):
+        read_bars()
@@ -0,0 +1,104 @@
+import pytest
+from conftest import make_bars, make_ta
+from fastapi.testclient import TestClient
+
+from src.api.server import app
+from src.live_store import store
+
+
+@pytest.fixture
+def client(tmp_db):
+    # The live store is process-wide; don't serve buffers loaded from another test's DB
+    store.clear()
+    yield TestClient(app)
+    store.clear()
+
+
+def test_unchanged_recalculation_keeps_versions(tmp_db):
+    tmp_db.save_technical_analysis(make_ta(make_bars("SPY", 0, 50)))
+    version = tmp_db.get_data_version("SPY", "5T")
+    assert version > 0
+
+    tmp_db.save_technical_analysis(make_ta(make_bars("SPY", 0, 50)))
+    assert tmp_db.get_data_version("SPY", "5T") == version
+    assert tmp_db.get_technical_analysis("SPY", "5T", since=version) == []
+
+
+def test_recalculation_only_stamps_changed_rows(tmp_db):
+    tmp_db.save_technical_analysis(make_ta(make_bars("SPY", 0, 50)))
+    version = tmp_db.get_data_version("SPY", "5T")
+
+    rows = make_ta(make_bars("SPY", 0, 50))
+    rows[-1]["indicators"]["EMA9"] += 1
+    rows.append(make_ta(make_bars("SPY", 50))[0])
+    tmp_db.save_technical_analysis(rows)
+
+    assert tmp_db.get_data_version("SPY", "5T") > version
+    delta = tmp_db.get_technical_analysis("SPY", "5T", since=version)
+    assert [r["timestamp"] for r in delta] == [rows[-2]["timestamp"], rows[-1]["timestamp"]]
+
+
+def test_versions_never_move_backwards(tmp_db):
+    tmp_db.save_market_data(make_bars("SPY", 0, 1), "5T")
+    version = tmp_db.get_data_version("SPY", "5T")
+
+    # A writer that stamped earlier but commits later must not roll the version back
+    tmp_db._bump_versions(tmp_db.get_conn(), {("SPY", "5T")}, version - 1)
+    assert tmp_db.get_data_version("SPY", "5T") == version
+
+
+@pytest.mark.parametrize("path", ["/data/SPY/5T", "/data/SPY/5T?limit=5", "/ta/SPY/5T"])
+def test_etag_returns_304_until_data_changes(client, tmp_db, path):
+    bars = make_bars("SPY", 0, 10)
+    tmp_db.save_market_data(bars, "5T")
+    tmp_db.save_technical_analysis(make_ta(bars))
+
+    first = client.get(path)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert first.json()["version"] == tmp_db.get_data_version("SPY", "5T")
+
+    cached = client.get(path, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+
+    new_bar = make_bars("SPY", 10)
+    tmp_db.save_market_data(new_bar, "5T")
+    tmp_db.save_technical_analysis(make_ta(new_bar))
+
+    changed = client.get(path, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_data_since_returns_only_newer_rows(client, tmp_db):
+    bars = make_bars("SPY", 0, 10)
+    tmp_db.save_market_data(bars, "5T")
+    tmp_db.save_technical_analysis(make_ta(bars))
+    version = client.get("/data/SPY/5T").json()["version"]
+
+    new_bar = make_bars("SPY", 10)
+    tmp_db.save_market_data(new_bar, "5T")
+    tmp_db.save_technical_analysis(make_ta(new_bar))
+
+    delta = client.get(f"/data/SPY/5T?since={version}").json()
+    time = int(new_bar[0]["timestamp"].timestamp())
+    assert [bar["time"] for bar in delta["bars"]] == [time]
+    assert delta["indicator_times"] == [time]
+    assert delta["indicators"]["EMA9"] == [new_bar[0]["close"] - 1]
+    assert delta["version"] > version
+
+    assert client.get(f"/data/SPY/5T?since={delta['version']}").json()["bars"] == []
+
+
+def test_ta_since_returns_only_newer_rows(client, tmp_db):
+    bars = make_bars("SPY", 0, 10)
+    tmp_db.save_technical_analysis(make_ta(bars))
+    version = client.get("/ta/SPY/5T").json()["version"]
+
+    rows = make_ta(make_bars("SPY", 0, 11))
+    tmp_db.save_technical_analysis(rows)
+
+    delta = client.get(f"/ta/SPY/5T?since={version}").json()
+    assert len(delta["data"]) == 1
+    assert delta["version"] > version